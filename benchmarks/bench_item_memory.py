@@ -0,0 +1,68 @@
+"""Compare the memory used by raw item dicts and AnylistItems.
+
+Both representations are decoded from the same JSON payloads, the way the
+coordinator receives them. Run from the repository root in an environment with
+Home Assistant installed:
+
+    python benchmarks/bench_item_memory.py --lists 50 --items 2000
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import tracemalloc
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from custom_components.anylist.models import AnylistItems
+
+def make_payloads(list_count, item_count, distinct_names):
+    return [
+        json.dumps(
+            {
+                "items": [
+                    {
+                        "id": uuid.uuid4().hex,
+                        "name": "Item {}".format(item_index % distinct_names),
+                        "checked": item_index % 4 != 0,
+                        "notes": ""
+                    }
+                    for item_index in range(item_count)
+                ]
+            }
+        )
+        for _ in range(list_count)
+    ]
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    data = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return data, current
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lists", type = int, default = 50)
+    parser.add_argument("--items", type = int, default = 2000)
+    parser.add_argument("--names", type = int, default = 500, help = "Distinct item names, since checked-off history repeats names")
+    args = parser.parse_args()
+
+    payloads = make_payloads(args.lists, args.items, args.names)
+
+    raw, raw_bytes = measure(lambda: [json.loads(payload)["items"] for payload in payloads])
+    del raw
+    compact, compact_bytes = measure(lambda: [AnylistItems.from_json(json.loads(payload)["items"]) for payload in payloads])
+    del compact
+
+    print("lists: {}, items per list: {}, distinct names: {}".format(args.lists, args.items, args.names))
+    print("dict items:   {:.2f} MB".format(raw_bytes / 1024 / 1024))
+    print("AnylistItems: {:.2f} MB".format(compact_bytes / 1024 / 1024))
+    print("saved:        {:.0%}".format(1 - compact_bytes / raw_bytes if raw_bytes else 0))
+
+if __name__ == "__main__":
+    main()
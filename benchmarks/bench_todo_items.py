@@ -0,0 +1,65 @@
+"""Measure repeated todo_items reads on a large list.
+
+Run from the repository root in an environment with Home Assistant installed:
+
+    python benchmarks/bench_todo_items.py --items 1000 --reads 100
+"""
+
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from custom_components.anylist.models import AnylistItems
+from custom_components.anylist.todo import AnylistTodoListEntity
+
+class BenchmarkCoordinator:
+
+    def __init__(self, items):
+        self.items = items
+
+    def get_list_items(self, list_name):
+        return self.items
+
+    def get_snapshot_age(self, list_name):
+        return None
+
+def make_items(count):
+    return AnylistItems.from_json(
+        {"id": str(index), "name": "Item {}".format(index), "checked": index % 3 == 0, "notes": ""}
+        for index in range(count)
+    )
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type = int, default = 1000)
+    parser.add_argument("--reads", type = int, default = 100)
+    args = parser.parse_args()
+
+    coordinator = BenchmarkCoordinator(make_items(args.items))
+    entity = AnylistTodoListEntity(None, coordinator, "Benchmark")
+
+    def cold_reads():
+        # A fresh list object on every read forces a rebuild, like the uncached code path
+        for _ in range(args.reads):
+            coordinator.items = AnylistItems(coordinator.items)
+            entity.todo_items
+            entity.extra_state_attributes
+
+    def warm_reads():
+        for _ in range(args.reads):
+            entity.todo_items
+            entity.extra_state_attributes
+
+    cold = min(timeit.repeat(cold_reads, number = 1, repeat = 5))
+    warm = min(timeit.repeat(warm_reads, number = 1, repeat = 5))
+
+    print("items: {}, reads per run: {}".format(args.items, args.reads))
+    print("rebuilt on every read: {:.2f} ms".format(cold * 1000))
+    print("memoized:              {:.2f} ms".format(warm * 1000))
+    print("speedup:               {:.0f}x".format(cold / warm if warm else float("inf")))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""Local stand-in for the Anylist addon server.
+
+Implements /items (with the checked and fields filters), /lists, /add,
+/remove, /update, /check and the /events websocket with configurable latency
+and list sizes. It can be run on its own and used as the server URL of the
+integration:
+
+    python benchmarks/fake_server.py --port 28598 --lists 50 --items 2000
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import uuid
+
+from aiohttp import web, WSMsgType
+
+class FakeAnylistServer:
+
+    def __init__(self, list_count = 50, item_count = 2000, latency = 0.0):
+        self.latency = latency
+        self.lists = {
+            "List {}".format(list_index): [
+                {
+                    "id": uuid.uuid4().hex,
+                    "name": "Item {} {}".format(list_index, item_index),
+                    "checked": item_index % 4 == 0,
+                    "notes": ""
+                }
+                for item_index in range(item_count)
+            ]
+            for list_index in range(list_count)
+        }
+        self.versions = {list_name: 0 for list_name in self.lists}
+        self.request_counts = dict()
+        self.sockets = set()
+        self.runner = None
+        self.url = None
+
+    def create_app(self):
+        app = web.Application()
+        app.router.add_get("/items", self.handle_items)
+        app.router.add_get("/lists", self.handle_lists)
+        app.router.add_post("/add", self.handle_add)
+        app.router.add_post("/remove", self.handle_remove)
+        app.router.add_post("/update", self.handle_update)
+        app.router.add_post("/check", self.handle_check)
+        app.router.add_get("/events", self.handle_events)
+        return app
+
+    async def start(self, host = "127.0.0.1", port = 0):
+        self.runner = web.AppRunner(self.create_app())
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, host, port)
+        await site.start()
+        host, port = self.runner.addresses[0][:2]
+        self.url = "http://{}:{}".format(host, port)
+        return self.url
+
+    async def stop(self):
+        for ws in list(self.sockets):
+            await ws.close()
+        if self.runner is not None:
+            await self.runner.cleanup()
+
+    async def begin(self, request):
+        endpoint = request.path.strip("/")
+        self.request_counts[endpoint] = self.request_counts.get(endpoint, 0) + 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    def find_list(self, list_name):
+        if list_name in self.lists:
+            return list_name
+        return next(iter(self.lists), None)
+
+    async def changed(self, list_name):
+        self.versions[list_name] += 1
+        message = json.dumps({"list": list_name})
+        for ws in list(self.sockets):
+            await ws.send_str(message)
+
+    def etag(self, value):
+        return '"{}"'.format(hashlib.sha1(value.encode()).hexdigest())
+
+    async def handle_items(self, request):
+        await self.begin(request)
+        list_name = self.find_list(request.query.get("list"))
+        if list_name is None:
+            return web.Response(status = 404)
+
+        etag = self.etag("{}:{}".format(list_name, self.versions[list_name]))
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status = 304, headers = {"ETag": etag})
+
+        items = self.lists[list_name]
+        if "checked" in request.query:
+            checked = request.query["checked"] == "true"
+            items = [item for item in items if item["checked"] == checked]
+        if "fields" in request.query:
+            fields = request.query["fields"].split(",")
+            items = [{field: item[field] for field in fields if field in item} for item in items]
+
+        return web.json_response({"items": items}, headers = {"ETag": etag})
+
+    async def handle_lists(self, request):
+        await self.begin(request)
+        etag = self.etag(",".join(self.lists))
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status = 304, headers = {"ETag": etag})
+
+        return web.json_response({"lists": list(self.lists)}, headers = {"ETag": etag})
+
+    async def handle_add(self, request):
+        await self.begin(request)
+        body = await request.json()
+        list_name = self.find_list(body.get("list"))
+        if list_name is None:
+            return web.Response(status = 404)
+
+        items = self.lists[list_name]
+        if any(item["name"].lower() == body["name"].lower() and not item["checked"] for item in items):
+            return web.Response(status = 304)
+
+        items.append(
+            {
+                "id": uuid.uuid4().hex,
+                "name": body["name"],
+                "checked": False,
+                "notes": body.get("notes", "")
+            }
+        )
+        await self.changed(list_name)
+        return web.Response(status = 200)
+
+    async def handle_remove(self, request):
+        await self.begin(request)
+        body = await request.json()
+        list_name = self.find_list(body.get("list"))
+        if list_name is None:
+            return web.Response(status = 404)
+
+        item = self.find_item(list_name, body)
+        if item is None:
+            return web.Response(status = 304)
+
+        self.lists[list_name].remove(item)
+        await self.changed(list_name)
+        return web.Response(status = 200)
+
+    async def handle_update(self, request):
+        await self.begin(request)
+        body = await request.json()
+        list_name = self.find_list(body.get("list"))
+        item = self.find_item(list_name, body) if list_name is not None else None
+        if item is None:
+            return web.Response(status = 404)
+
+        for key in ("name", "checked", "notes"):
+            if key in body:
+                item[key] = body[key]
+        await self.changed(list_name)
+        return web.Response(status = 200)
+
+    async def handle_check(self, request):
+        await self.begin(request)
+        body = await request.json()
+        list_name = self.find_list(body.get("list"))
+        item = self.find_item(list_name, body) if list_name is not None else None
+        if item is None:
+            return web.Response(status = 404)
+
+        if item["checked"] == body["checked"]:
+            return web.Response(status = 304)
+
+        item["checked"] = body["checked"]
+        await self.changed(list_name)
+        return web.Response(status = 200)
+
+    async def handle_events(self, request):
+        ws = web.WebSocketResponse(heartbeat = 30)
+        await ws.prepare(request)
+        self.sockets.add(ws)
+        try:
+            async for message in ws:
+                if message.type == WSMsgType.ERROR:
+                    break
+        finally:
+            self.sockets.discard(ws)
+        return ws
+
+    def find_item(self, list_name, body):
+        items = self.lists[list_name]
+        if "id" in body:
+            return next((item for item in items if item["id"] == body["id"]), None)
+
+        name = body.get("name", "").strip().lower()
+        return next((item for item in items if item["name"].lower() == name), None)
+
+async def serve(args):
+    server = FakeAnylistServer(args.lists, args.items, args.latency / 1000)
+    url = await server.start(args.host, args.port)
+    print("Fake Anylist server listening on {}".format(url))
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default = "127.0.0.1")
+    parser.add_argument("--port", type = int, default = 28598)
+    parser.add_argument("--lists", type = int, default = 5)
+    parser.add_argument("--items", type = int, default = 100)
+    parser.add_argument("--latency", type = float, default = 0, help = "Added latency per request in milliseconds")
+    asyncio.run(serve(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+"""Benchmark the integration against a local stand-in Anylist server.
+
+Drives the real Anylist client, AnylistUpdateCoordinator and
+AnylistTodoListEntity through startup, polling, burst writes and reads.
+Run from the repository root in an environment with Home Assistant installed:
+
+    python benchmarks/run.py --lists 50 --items 2000 --output results.json
+    python benchmarks/run.py --compare results.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.anylist import Anylist
+from custom_components.anylist.const import DOMAIN, CONF_SERVER_ADDR
+from custom_components.anylist.coordinator import AnylistUpdateCoordinator
+from custom_components.anylist.todo import AnylistTodoListEntity
+
+from fake_server import FakeAnylistServer
+
+LOOP_MONITOR_INTERVAL = 0.005
+
+COMPARED_METRICS = ("duration_s", "p50_ms", "p99_ms")
+
+class BenchmarkConfigEntry:
+
+    entry_id = "benchmark"
+    domain = DOMAIN
+    title = "Anylist Benchmark"
+
+    def __init__(self, data, options):
+        self.data = data
+        self.options = options
+        self.unload_callbacks = []
+
+    def async_on_unload(self, func):
+        self.unload_callbacks.append(func)
+
+    def async_create_background_task(self, hass, target, name, eager_start = True):
+        return hass.async_create_background_task(target, name)
+
+class LoopMonitor:
+
+    def __init__(self):
+        self.lags = []
+        self.task = None
+
+    def start(self):
+        self.task = asyncio.get_running_loop().create_task(self.run())
+
+    def stop(self):
+        self.task.cancel()
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(LOOP_MONITOR_INTERVAL)
+            self.lags.append(max(0, loop.time() - start - LOOP_MONITOR_INTERVAL))
+
+    def summary(self):
+        lags = sorted(self.lags)
+        return {
+            "samples": len(lags),
+            "max_lag_ms": round(lags[-1] * 1000, 2) if lags else None,
+            "p99_lag_ms": round(lags[int(0.99 * (len(lags) - 1))] * 1000, 2) if lags else None,
+            "blocked_ms": round(sum(lag for lag in lags if lag > LOOP_MONITOR_INTERVAL) * 1000, 2)
+        }
+
+def summarize(latencies, duration, server = None, requests_before = None):
+    ordered = sorted(latencies)
+    result = {
+        "operations": len(ordered),
+        "duration_s": round(duration, 4),
+        "throughput_per_s": round(len(ordered) / duration, 1) if duration else None,
+        "p50_ms": round(ordered[int(0.5 * (len(ordered) - 1))] * 1000, 3) if ordered else None,
+        "p99_ms": round(ordered[int(0.99 * (len(ordered) - 1))] * 1000, 3) if ordered else None
+    }
+    if server is not None:
+        result["server_requests"] = sum(server.request_counts.values()) - requests_before
+    return result
+
+async def timed(func):
+    start = time.perf_counter()
+    await func()
+    return time.perf_counter() - start
+
+class Benchmark:
+
+    def __init__(self, args):
+        self.args = args
+        self.server = FakeAnylistServer(args.lists, args.items, args.latency / 1000)
+        self.results = dict()
+
+    def request_count(self):
+        return sum(self.server.request_counts.values())
+
+    async def run(self):
+        url = await self.server.start()
+        with tempfile.TemporaryDirectory() as config_dir:
+            self.hass = HomeAssistant(config_dir)
+            self.entry = BenchmarkConfigEntry({CONF_SERVER_ADDR: url}, {})
+            self.anylist = self.hass.data[DOMAIN] = Anylist(self.entry)
+            self.anylist.open_session()
+
+            monitor = LoopMonitor()
+            monitor.start()
+            tracemalloc.start()
+            try:
+                await self.run_scenarios()
+            finally:
+                current, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                monitor.stop()
+                await self.coordinator.async_shutdown()
+                await self.anylist.close_session()
+                await self.server.stop()
+                await self.hass.async_stop(force = True)
+
+        return {
+            "config": {
+                "lists": self.args.lists,
+                "items": self.args.items,
+                "latency_ms": self.args.latency,
+                "burst": self.args.burst,
+                "rounds": self.args.rounds,
+                "python": platform.python_version()
+            },
+            "scenarios": self.results,
+            "memory": {
+                "current_mb": round(current / 1024 / 1024, 2),
+                "peak_mb": round(peak / 1024 / 1024, 2),
+                "after_startup_mb": self.startup_memory
+            },
+            "event_loop": monitor.summary()
+        }
+
+    async def run_scenarios(self):
+        await self.scenario_startup()
+        await self.scenario_poll("poll_unchanged", changed = False)
+        await self.scenario_poll("poll_changed", changed = True)
+        await self.scenario_burst_writes()
+        await self.scenario_cached_reads()
+        await self.scenario_entity_reads()
+
+    async def scenario_startup(self):
+        requests_before = self.request_count()
+
+        async def startup():
+            code, lists = await self.anylist.get_lists()
+            self.coordinator = AnylistUpdateCoordinator(self.hass, self.entry, lists, 30)
+            self.anylist.coordinator = self.coordinator
+            await self.coordinator.async_load_lists()
+            self.entities = [AnylistTodoListEntity(self.hass, self.coordinator, list_name) for list_name in lists]
+
+        duration = await timed(startup)
+        self.startup_memory = round(tracemalloc.get_traced_memory()[0] / 1024 / 1024, 2)
+        self.results["startup"] = summarize([duration], duration, self.server, requests_before)
+
+    async def scenario_poll(self, name, changed):
+        requests_before = self.request_count()
+        scheduler = self.coordinator.scheduler
+        # Every round polls every list, so the rounds are not limited by the per-minute budget
+        scheduler.budget = len(self.coordinator.list_names)
+        latencies = []
+        start = time.perf_counter()
+        for _ in range(self.args.rounds):
+            scheduler.requests.clear()
+            scheduler.mark_due(self.coordinator.list_names)
+            if changed:
+                for list_name in self.server.versions:
+                    self.server.versions[list_name] += 1
+            latencies.append(await timed(self.coordinator.async_refresh))
+        self.results[name] = summarize(latencies, time.perf_counter() - start, self.server, requests_before)
+
+    async def scenario_burst_writes(self):
+        requests_before = self.request_count()
+        list_names = list(self.server.lists)
+        latencies = []
+
+        async def add(index):
+            list_name = list_names[index % len(list_names)]
+            latencies.append(await timed(lambda: self.anylist.add_item("Burst {}".format(index), list_name = list_name)))
+
+        start = time.perf_counter()
+        await asyncio.gather(*[add(index) for index in range(self.args.burst)])
+        self.results["burst_writes"] = summarize(latencies, time.perf_counter() - start, self.server, requests_before)
+
+    async def scenario_cached_reads(self):
+        requests_before = self.request_count()
+        list_names = list(self.server.lists)
+        latencies = []
+
+        async def read(index):
+            list_name = list_names[index % len(list_names)]
+            latencies.append(await timed(lambda: self.anylist.get_all_items(list_name)))
+
+        start = time.perf_counter()
+        await asyncio.gather(*[read(index) for index in range(self.args.burst)])
+        self.results["service_reads"] = summarize(latencies, time.perf_counter() - start, self.server, requests_before)
+
+    async def scenario_entity_reads(self):
+        latencies = []
+        start = time.perf_counter()
+        for _ in range(self.args.rounds):
+            for entity in self.entities:
+                read_start = time.perf_counter()
+                entity.todo_items
+                entity.extra_state_attributes
+                latencies.append(time.perf_counter() - read_start)
+        self.results["entity_reads"] = summarize(latencies, time.perf_counter() - start)
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for name, scenario in results["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if previous is None:
+            continue
+
+        for metric in COMPARED_METRICS:
+            new, old = scenario.get(metric), previous.get(metric)
+            if not new or not old:
+                continue
+
+            change = (new - old) / old
+            print("{:<16} {:<12} {:>12} -> {:>12} ({:+.1%})".format(name, metric, old, new, change))
+            if change > threshold:
+                regressions.append((name, metric, change))
+
+    for name, metric, change in regressions:
+        print("Regression: {} {} is {:.1%} slower".format(name, metric, change))
+    return not regressions
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lists", type = int, default = 50)
+    parser.add_argument("--items", type = int, default = 2000)
+    parser.add_argument("--latency", type = float, default = 5, help = "Added server latency per request in milliseconds")
+    parser.add_argument("--burst", type = int, default = 200, help = "Concurrent service calls in the burst scenarios")
+    parser.add_argument("--rounds", type = int, default = 10, help = "Repetitions of the polling and entity read scenarios")
+    parser.add_argument("--output", help = "Write the results to this JSON file")
+    parser.add_argument("--compare", help = "Compare the results with a previous JSON results file")
+    parser.add_argument("--threshold", type = float, default = 0.2, help = "Relative slowdown reported as a regression")
+    args = parser.parse_args()
+
+    results = asyncio.run(Benchmark(args).run())
+    print(json.dumps(results, indent = 2))
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent = 2)
+
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        if not compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
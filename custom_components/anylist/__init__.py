@@ -1,13 +1,8 @@
 import aiohttp
+import asyncio
 import logging
-import os
-import stat
-import subprocess
-
-from threading import Thread
 
 from homeassistant.const import (
-    EVENT_HOMEASSISTANT_STOP,
     Platform,
 )
 from homeassistant.core import (
@@ -22,18 +17,36 @@ import homeassistant.helpers.config_validation as cv
 from .const import (
     DOMAIN,
     CONF_SERVER_ADDR,
-    CONF_EMAIL,
-    CONF_PASSWORD,
-    CONF_SERVER_BINARY,
     CONF_DEFAULT_LIST,
+    CONF_CONNECTION_LIMIT,
+    CONF_KEEPALIVE_TIMEOUT,
+    DEFAULT_CONNECTION_LIMIT,
+    DEFAULT_KEEPALIVE_TIMEOUT,
     ATTR_ID,
     ATTR_NAME,
     ATTR_LIST,
     ATTR_CHECKED,
-    ATTR_NOTES
+    ATTR_NOTES,
+    ATTR_NAMES,
+    ATTR_IDS,
+    ATTR_MAX_AGE,
+    CODE_QUEUED,
+    CODE_AMBIGUOUS
+)
+from .journal import AnylistJournal
+from .breaker import AnylistCircuitBreaker
+from .metrics import AnylistMetrics
+from .models import AnylistItems
+from .snapshot import AnylistSnapshot
+from .server import (
+    AnylistServer,
+    BINARY_SERVER_PORT,
+    get_server_socket,
+    start_server
 )
+from .writes import AnylistWriteQueue
 
-PLATFORMS: list[Platform] = [Platform.TODO]
+PLATFORMS: list[Platform] = [Platform.TODO, Platform.SENSOR]
 
 _LOGGER = logging.getLogger(DOMAIN)
 
@@ -43,8 +56,23 @@ SERVICE_CHECK_ITEM = "check_item"
 SERVICE_UNCHECK_ITEM = "uncheck_item"
 SERVICE_GET_ITEMS = "get_items"
 SERVICE_GET_ALL_ITEMS = "get_all_items"
+SERVICE_ADD_ITEMS = "add_items"
+SERVICE_REMOVE_ITEMS = "remove_items"
+SERVICE_CHECK_ITEMS = "check_items"
+SERVICE_UNCHECK_ITEMS = "uncheck_items"
+
+MUTATION_ERRORS = {
+    "add": "Failed to add item.",
+    "remove": "Failed to remove item.",
+    "update": "Failed to update item.",
+    "check": "Failed to update item status."
+}
 
-BINARY_SERVER_PORT = "28597"
+QUERY_FIELDS = "fields"
+PROJECTED_FIELDS = frozenset({ATTR_NAME, ATTR_CHECKED})
+
+READ_TIMEOUT = aiohttp.ClientTimeout(total = 20, connect = 5)
+WRITE_TIMEOUT = aiohttp.ClientTimeout(total = 10, connect = 5)
 
 SERVICE_ITEM_SCHEMA = vol.Schema(
     {
@@ -54,48 +82,53 @@ SERVICE_ITEM_SCHEMA = vol.Schema(
     }
 )
 
-SERVICE_LIST_SCHEMA = vol.Schema(
+SERVICE_ITEMS_SCHEMA = vol.Schema(
     {
+        vol.Required(ATTR_NAMES): vol.All(cv.ensure_list, [cv.string]),
         vol.Optional(ATTR_LIST, default = ""): cv.string
     }
 )
 
-def start_server(hass, config_entry):
-    binary = config_entry.data.get(CONF_SERVER_BINARY)
-    email = config_entry.data.get(CONF_EMAIL)
-    password = config_entry.data.get(CONF_PASSWORD)
+SERVICE_REMOVE_ITEMS_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            vol.Optional(ATTR_NAMES): vol.All(cv.ensure_list, [cv.string]),
+            vol.Optional(ATTR_IDS): vol.All(cv.ensure_list, [cv.string]),
+            vol.Optional(ATTR_LIST, default = ""): cv.string
+        }
+    ),
+    cv.has_at_least_one_key(ATTR_NAMES, ATTR_IDS)
+)
 
-    if binary is None or email is None or password is None:
-        return None
+SERVICE_LIST_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_LIST, default = ""): cv.string,
+        vol.Optional(ATTR_MAX_AGE): cv.positive_float
+    }
+)
 
-    if not os.path.isfile(binary):
-        raise HomeAssistantError("Failed to locate server binary")
-
-    if not os.access(binary, os.X_OK):
-        _LOGGER.debug("Fixing server binary permissions")
-        os.chmod(binary, os.stat(binary).st_mode | stat.S_IEXEC)
-
-    if not os.access(binary, os.X_OK):
-        raise HomeAssistantError("Failed to fix server binary permissions")
-
-    credentials_file = hass.config.path(".anylist_credentials")
-    server = AnylistServer(
-        [
-            binary,
-            "--port", BINARY_SERVER_PORT,
-            "--email", email,
-            "--password", password,
-            "--credentials-file", credentials_file,
-            "--ip-filter", "127.0.0.1"
-        ]
-    )
-    server.start()
+def batch_response(items, codes):
+    failed = [code for code in codes if code != 200 and code != 304 and code != CODE_QUEUED]
+    for item, code in zip(items, codes):
+        item["code"] = code
+
+    return {"code": failed[0] if failed else 200, "items": items}
+
+def add_matches(anylist, response, list_name):
+    if response["code"] == CODE_AMBIGUOUS:
+        response["matches"] = [item.name for item in anylist.find_items(response[ATTR_NAME], list_name)]
+    return response
 
-    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, server.stop)
-    return server
+def add_batch_matches(anylist, response, list_name):
+    for item in response["items"]:
+        if ATTR_NAME in item:
+            add_matches(anylist, item, list_name)
+    return response
 
 async def async_setup_entry(hass, config_entry):
     anylist = hass.data[DOMAIN] = Anylist(config_entry)
+    anylist.open_session(get_server_socket(hass, config_entry))
+    anylist.journal = AnylistJournal(hass, anylist, config_entry)
 
     async def add_item_service(call):
         item_name = call.data[ATTR_NAME]
@@ -107,29 +140,65 @@ async def async_setup_entry(hass, config_entry):
         item_name = call.data[ATTR_NAME]
         list_name = call.data.get(ATTR_LIST)
         code = await anylist.remove_item_by_name(item_name, list_name)
-        return {"code": code}
+        return add_matches(anylist, {ATTR_NAME: item_name, "code": code}, list_name)
 
     async def check_item_service(call):
         item_name = call.data[ATTR_NAME]
         list_name = call.data.get(ATTR_LIST)
         code = await anylist.check_item(item_name, list_name, True)
-        return {"code": code}
+        return add_matches(anylist, {ATTR_NAME: item_name, "code": code}, list_name)
 
     async def uncheck_item_service(call):
         item_name = call.data[ATTR_NAME]
         list_name = call.data.get(ATTR_LIST)
         code = await anylist.check_item(item_name, list_name, False)
-        return {"code": code}
+        return add_matches(anylist, {ATTR_NAME: item_name, "code": code}, list_name)
 
     async def get_items_service(call) -> ServiceResponse:
         list_name = call.data.get(ATTR_LIST)
-        (code, items) = await anylist.get_items(list_name)
-        return {"code": code, "items": items}
+        max_age = call.data.get(ATTR_MAX_AGE)
+        (code, items, age) = await anylist.get_items(list_name, max_age)
+        return {"code": code, "items": items, "age": age}
 
     async def get_all_items_service(call) -> ServiceResponse:
         list_name = call.data.get(ATTR_LIST)
-        (code, (unchecked_items, checked_items)) = await anylist.get_all_items(list_name)
-        return {"code": code, "uncheckedItems": unchecked_items, "checkedItems": checked_items}
+        max_age = call.data.get(ATTR_MAX_AGE)
+        (code, (unchecked_items, checked_items), age) = await anylist.get_all_items(list_name, max_age)
+        return {"code": code, "uncheckedItems": unchecked_items, "checkedItems": checked_items, "age": age}
+
+    async def add_items_service(call) -> ServiceResponse:
+        item_names = call.data[ATTR_NAMES]
+        list_name = call.data.get(ATTR_LIST)
+        codes = await anylist.add_items(item_names, list_name)
+        return batch_response([{ATTR_NAME: name} for name in item_names], codes)
+
+    async def remove_items_service(call) -> ServiceResponse:
+        item_names = call.data.get(ATTR_NAMES, [])
+        item_ids = call.data.get(ATTR_IDS, [])
+        list_name = call.data.get(ATTR_LIST)
+        name_codes, id_codes = await asyncio.gather(
+            anylist.remove_items_by_name(item_names, list_name),
+            anylist.remove_items_by_id(item_ids, list_name)
+        )
+        response = batch_response(
+            [{ATTR_NAME: name} for name in item_names] + [{ATTR_ID: item_id} for item_id in item_ids],
+            name_codes + id_codes
+        )
+        return add_batch_matches(anylist, response, list_name)
+
+    async def check_items_service(call) -> ServiceResponse:
+        item_names = call.data[ATTR_NAMES]
+        list_name = call.data.get(ATTR_LIST)
+        codes = await anylist.check_items(item_names, list_name, True)
+        response = batch_response([{ATTR_NAME: name} for name in item_names], codes)
+        return add_batch_matches(anylist, response, list_name)
+
+    async def uncheck_items_service(call) -> ServiceResponse:
+        item_names = call.data[ATTR_NAMES]
+        list_name = call.data.get(ATTR_LIST)
+        codes = await anylist.check_items(item_names, list_name, False)
+        response = batch_response([{ATTR_NAME: name} for name in item_names], codes)
+        return add_batch_matches(anylist, response, list_name)
 
     hass.services.async_register(
         DOMAIN, SERVICE_ADD_ITEM, add_item_service,
@@ -156,12 +225,40 @@ async def async_setup_entry(hass, config_entry):
         schema = SERVICE_LIST_SCHEMA, supports_response = SupportsResponse.ONLY
     )
 
-    server = start_server(hass, config_entry)
-    if server:
-        anylist.binary_server = server
-        _LOGGER.info("Server binary successfully started")
+    hass.services.async_register(
+        DOMAIN, SERVICE_ADD_ITEMS, add_items_service,
+        schema = SERVICE_ITEMS_SCHEMA, supports_response = SupportsResponse.OPTIONAL
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_REMOVE_ITEMS, remove_items_service,
+        schema = SERVICE_REMOVE_ITEMS_SCHEMA, supports_response = SupportsResponse.OPTIONAL
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_CHECK_ITEMS, check_items_service,
+        schema = SERVICE_ITEMS_SCHEMA, supports_response = SupportsResponse.OPTIONAL
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_UNCHECK_ITEMS, uncheck_items_service,
+        schema = SERVICE_ITEMS_SCHEMA, supports_response = SupportsResponse.OPTIONAL
+    )
 
-    await hass.config_entries.async_forward_entry_setups(config_entry, PLATFORMS)
+    try:
+        server = start_server(hass, config_entry)
+        if server:
+            anylist.binary_server = server
+            _LOGGER.info("Server binary successfully started")
+
+        await anylist.journal.async_load()
+
+        await hass.config_entries.async_forward_entry_setups(config_entry, PLATFORMS)
+    except Exception:
+        # A failed setup is retried from scratch, so nothing may be left running
+        if isinstance(anylist.binary_server, AnylistServer):
+            anylist.binary_server.stop()
+        anylist.journal.cancel()
+        hass.data.pop(DOMAIN, None)
+        await anylist.close_session()
+        raise
 
     return True
 
@@ -171,16 +268,61 @@ async def async_unload_entry(hass, config_entry):
         server.stop()
 
     if unload_ok := await hass.config_entries.async_unload_platforms(config_entry, PLATFORMS):
-        hass.data.pop(DOMAIN)
+        anylist = hass.data.pop(DOMAIN)
+        await anylist.journal.stop()
+        await anylist.close_session()
 
     return unload_ok
 
+async def async_remove_entry(hass, config_entry):
+    await AnylistSnapshot(hass, config_entry).async_remove()
+    await AnylistJournal(hass, None, config_entry).async_remove()
+
 class Anylist:
 
     binary_server = None
+    coordinator = None
+    journal = None
+    session = None
+    server_filtering = None
+    socket_path = None
 
     def __init__(self, config_entry):
         self.config_entry = config_entry
+        self.etags = dict()
+        self.pending_reads = dict()
+        self.write_queues = dict()
+        self.metrics = AnylistMetrics()
+        self.breaker = AnylistCircuitBreaker()
+        self.read_count = 0
+        self.coalesced_read_count = 0
+        self.connection_limit = int(config_entry.options.get(CONF_CONNECTION_LIMIT, DEFAULT_CONNECTION_LIMIT))
+        self.batch_semaphore = asyncio.Semaphore(self.connection_limit)
+
+    def open_session(self, socket_path = None):
+        keepalive_timeout = self.config_entry.options.get(CONF_KEEPALIVE_TIMEOUT, DEFAULT_KEEPALIVE_TIMEOUT)
+        if socket_path is not None:
+            connector = aiohttp.UnixConnector(
+                socket_path,
+                limit_per_host = self.connection_limit,
+                keepalive_timeout = keepalive_timeout
+            )
+        else:
+            connector = aiohttp.TCPConnector(
+                limit_per_host = self.connection_limit,
+                keepalive_timeout = keepalive_timeout
+            )
+
+        self.socket_path = socket_path
+        self.session = aiohttp.ClientSession(connector = connector)
+
+    async def close_session(self):
+        for queue in self.write_queues.values():
+            queue.cancel()
+
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
 
     def populate_item_updates(self, item, updates):
         if updates is None:
@@ -204,25 +346,25 @@ class Anylist:
         self.populate_item_updates(body, updates)
         body[ATTR_CHECKED] = False
 
-        async with aiohttp.ClientSession() as session:
-            async with session.post(self.get_server_url("add"), json = body) as response:
-                code = response.status
-                if code != 200 and code != 304:
-                    _LOGGER.error("Failed to add item. Received error code %d.", code)
+        return await self.get_write_queue(body[ATTR_LIST]).submit("add", body)
+
+    async def remove_item_by_name(self, item_name, list_name = None, resolve = True):
+        matches = self.find_items(item_name, list_name) if resolve else []
+        if len(matches) == 1:
+            code = await self.remove_item_by_id(matches[0].id, list_name)
+            # The cached id may be stale, e.g. when the item was re-added in the app, so the server matches the name instead
+            if code != 304 and code != 404:
                 return code
+        elif len(matches) > 1:
+            _LOGGER.warning("Failed to remove item. Multiple items match %s.", item_name)
+            return CODE_AMBIGUOUS
 
-    async def remove_item_by_name(self, item_name, list_name = None):
         body = {
             ATTR_NAME: item_name.strip(),
             ATTR_LIST: self.get_list_name(list_name)
         }
 
-        async with aiohttp.ClientSession() as session:
-            async with session.post(self.get_server_url("remove"), json = body) as response:
-                code = response.status
-                if code != 200 and code != 304:
-                    _LOGGER.error("Failed to remove item. Received error code %d.", code)
-                return code
+        return await self.get_write_queue(body[ATTR_LIST]).submit("remove", body)
 
     async def remove_item_by_id(self, item_id, list_name = None):
         body = {
@@ -230,12 +372,7 @@ class Anylist:
             ATTR_LIST: self.get_list_name(list_name)
         }
 
-        async with aiohttp.ClientSession() as session:
-            async with session.post(self.get_server_url("remove"), json = body) as response:
-                code = response.status
-                if code != 200 and code != 304:
-                    _LOGGER.error("Failed to remove item. Received error code %d.", code)
-                return code
+        return await self.get_write_queue(body[ATTR_LIST]).submit("remove", body)
 
     async def update_item(self, item_id, updates, list_name = None):
         body = {
@@ -245,84 +382,256 @@ class Anylist:
 
         self.populate_item_updates(body, updates)
 
-        async with aiohttp.ClientSession() as session:
-            async with session.post(self.get_server_url("update"), json = body) as response:
-                code = response.status
-                if code != 200:
-                    _LOGGER.error("Failed to update item. Received error code %d.", code)
+        return await self.get_write_queue(body[ATTR_LIST]).submit("update", body)
+
+    async def check_item(self, item_name, list_name = None, checked = True, resolve = True):
+        matches = self.find_items(item_name, list_name) if resolve else []
+        if len(matches) > 1:
+            # Prefer the items that are not already in the requested state
+            matches = [item for item in matches if item.checked != checked] or matches
+
+        if len(matches) == 1:
+            code = await self.update_item(matches[0].id, {ATTR_CHECKED: checked}, list_name)
+            if code != 304 and code != 404:
                 return code
+        elif len(matches) > 1:
+            _LOGGER.warning("Failed to update item status. Multiple items match %s.", item_name)
+            return CODE_AMBIGUOUS
 
-    async def check_item(self, item_name, list_name = None, checked = True):
         body = {
             ATTR_NAME: item_name.strip(),
             ATTR_LIST: self.get_list_name(list_name),
             ATTR_CHECKED: checked
         }
 
-        async with aiohttp.ClientSession() as session:
-            async with session.post(self.get_server_url("check"), json = body) as response:
-                code = response.status
-                if code != 200 and code != 304:
-                    _LOGGER.error("Failed to update item status. Received error code %d.", code)
+        return await self.get_write_queue(body[ATTR_LIST]).submit("check", body)
+
+    def get_write_queue(self, list_name):
+        queue = self.write_queues.get(list_name)
+        if queue is None:
+            queue = self.write_queues[list_name] = AnylistWriteQueue(self, list_name)
+        return queue
+
+    async def send_mutation(self, endpoint, body):
+        await self.async_wait_for_server()
+        with self.breaker.guard() as guard, self.metrics.measure(endpoint) as timer:
+            async with self.session.post(self.get_server_url(endpoint), json = body, timeout = WRITE_TIMEOUT) as response:
+                code = guard.status = timer.status = response.status
+                timer.size = response.content_length
+                if code != 200 and (code != 304 or endpoint == "update"):
+                    _LOGGER.error("%s Received error code %d.", MUTATION_ERRORS[endpoint], code)
                 return code
 
-    async def get_detailed_items(self, list_name = None):
-        if name := self.get_list_name(list_name):
+    def find_items(self, item_name, list_name = None):
+        name = self.get_list_name(list_name)
+        if self.coordinator is None or name not in self.coordinator.list_names:
+            return []
+
+        return self.coordinator.get_list_index(name).find(item_name)
+
+    async def queue_batch(self, coros):
+        # Writes only wait on the write queue, so they are not limited by the batch semaphore
+        # and every item of the batch joins the same flush
+        return list(await asyncio.gather(*coros))
+
+    async def add_items(self, item_names, list_name = None):
+        return await self.queue_batch(
+            [self.add_item(item_name, list_name = list_name) for item_name in item_names]
+        )
+
+    async def remove_items_by_name(self, item_names, list_name = None, resolve = True):
+        return await self.queue_batch(
+            [self.remove_item_by_name(item_name, list_name, resolve) for item_name in item_names]
+        )
+
+    async def remove_items_by_id(self, item_ids, list_name = None):
+        return await self.queue_batch(
+            [self.remove_item_by_id(item_id, list_name) for item_id in item_ids]
+        )
+
+    async def check_items(self, item_names, list_name = None, checked = True):
+        return await self.queue_batch(
+            [self.check_item(item_name, list_name, checked) for item_name in item_names]
+        )
+
+    async def get_detailed_items(self, list_name = None, conditional = False):
+        key = (self.get_list_name(list_name), conditional)
+        self.read_count += 1
+
+        # Concurrent reads of the same list share one request
+        task = self.pending_reads.get(key)
+        if task is not None:
+            self.coalesced_read_count += 1
+        else:
+            task = asyncio.get_running_loop().create_task(self.fetch_detailed_items(*key))
+            self.pending_reads[key] = task
+            task.add_done_callback(lambda _: self.pending_reads.pop(key, None))
+
+        return await asyncio.shield(task)
+
+    async def fetch_detailed_items(self, list_name, conditional):
+        await self.async_wait_for_server()
+        if list_name:
             query = {
-                ATTR_LIST: name
+                ATTR_LIST: list_name
             }
         else:
             query = None
 
-        async with aiohttp.ClientSession() as session:
-            async with session.get(self.get_server_url("items"), params = query) as response:
-                code = response.status
+        etag_key = ("items", list_name)
+        headers = self.get_conditional_headers(etag_key, conditional)
+
+        with self.breaker.guard() as guard, self.metrics.measure("items") as timer:
+            async with self.session.get(self.get_server_url("items"), params = query, headers = headers, timeout = READ_TIMEOUT) as response:
+                code = guard.status = timer.status = response.status
                 if code == 200:
+                    self.store_etag(etag_key, response)
+                    timer.size = len(await response.read())
                     body = await response.json()
                     return (code, body["items"] or [])
+                elif code == 304 and conditional:
+                    return (code, None)
                 else:
                     _LOGGER.error("Failed to get items. Received error code %d.", code)
                     return (code, [])
 
-    async def get_items(self, list_name = None):
-        code, items = await self.get_detailed_items(list_name)
-        if code == 200:
-            items = list(filter(lambda item: not item[ATTR_CHECKED], items))
-            items = list(map(lambda item: item[ATTR_NAME], items))
+    async def run_batch(self, coros):
+        async def run(coro):
+            async with self.batch_semaphore:
+                return await coro
+
+        return list(await asyncio.gather(*[run(coro) for coro in coros]))
+
+    async def get_cached_items(self, list_name = None, max_age = None, unchecked_only = False):
+        name = self.get_list_name(list_name)
+        if self.coordinator is not None and name in self.coordinator.list_names:
+            return await self.coordinator.async_get_list_items(name, max_age)
+
+        try:
+            code, items = await self.fetch_projected_items(name, unchecked_only)
+        except asyncio.TimeoutError as err:
+            raise HomeAssistantError("Timed out getting items") from err
+        except aiohttp.ClientError as err:
+            raise HomeAssistantError("Failed to get items: {}".format(err)) from err
+        return (code, AnylistItems.from_json(items), 0)
+
+    async def fetch_projected_items(self, list_name, unchecked_only, filtered = None):
+        await self.async_wait_for_server()
+        query = dict()
+        if list_name:
+            query[ATTR_LIST] = list_name
+
+        if filtered is None:
+            filtered = self.server_filtering is not False
+        if filtered:
+            query[QUERY_FIELDS] = ",".join(sorted(PROJECTED_FIELDS))
+            if unchecked_only:
+                query[ATTR_CHECKED] = "false"
+
+        with self.breaker.guard() as guard, self.metrics.measure("items") as timer:
+            async with self.session.get(self.get_server_url("items"), params = query or None, timeout = READ_TIMEOUT) as response:
+                code = guard.status = timer.status = response.status
+                if code == 200:
+                    timer.size = response.content_length
+                    body = await response.json()
+                    items = body["items"] or []
+
+        if code != 200 and filtered and self.server_filtering is None and 400 <= code < 500:
+            # Servers may reject the query parameters they do not know
+            code, items = await self.fetch_projected_items(list_name, unchecked_only, filtered = False)
+            if code == 200:
+                _LOGGER.debug("Server does not support item filtering")
+                self.server_filtering = False
             return (code, items)
-        else:
+
+        if code != 200:
+            _LOGGER.error("Failed to get items. Received error code %d.", code)
             return (code, [])
 
-    async def get_all_items(self, list_name = None):
-        code, items = await self.get_detailed_items(list_name)
-        if code == 200:
-            unchecked_items = list(filter(lambda item: not item[ATTR_CHECKED], items))
-            unchecked_items = list(map(lambda item: item[ATTR_NAME], unchecked_items))
+        if filtered and items:
+            self.update_server_filtering(items, unchecked_only)
+        return (code, items)
 
-            checked_items = list(filter(lambda item: item[ATTR_CHECKED], items))
-            checked_items = list(map(lambda item: item[ATTR_NAME], checked_items))
+    def update_server_filtering(self, items, unchecked_only):
+        # Servers that ignore the query parameters send every field of every item
+        honoured = all(
+            item.keys() <= PROJECTED_FIELDS and not (unchecked_only and item.get(ATTR_CHECKED))
+            for item in items
+        )
+        if honoured != self.server_filtering:
+            _LOGGER.debug("Server %s item filtering", "supports" if honoured else "does not support")
+        self.server_filtering = honoured
 
-            return (code, (unchecked_items, checked_items))
+    async def get_items(self, list_name = None, max_age = None):
+        code, items, age = await self.get_cached_items(list_name, max_age, unchecked_only = True)
+        if code == 200:
+            return (code, items.unchecked_names, age)
+        else:
+            return (code, [], age)
+
+    async def get_all_items(self, list_name = None, max_age = None):
+        code, items, age = await self.get_cached_items(list_name, max_age)
+        if code == 200:
+            return (code, (items.unchecked_names, items.checked_names), age)
         else:
-            return (code, ([], []))
+            return (code, ([], []), age)
+
+    async def get_lists(self, conditional = False):
+        await self.async_wait_for_server()
+        etag_key = ("lists", None)
+        headers = self.get_conditional_headers(etag_key, conditional)
 
-    async def get_lists(self):
-        async with aiohttp.ClientSession() as session:
-            async with session.get(self.get_server_url("lists")) as response:
-                code = response.status
+        with self.breaker.guard() as guard, self.metrics.measure("lists") as timer:
+            async with self.session.get(self.get_server_url("lists"), headers = headers, timeout = READ_TIMEOUT) as response:
+                code = guard.status = timer.status = response.status
                 if code == 200:
+                    self.store_etag(etag_key, response)
+                    timer.size = len(await response.read())
                     body = await response.json()
                     return (code, body["lists"] or [])
+                elif code == 304 and conditional:
+                    return (code, None)
                 else:
                     _LOGGER.error("Failed to get lists. Received error code %d.", code)
                     return (code, [])
 
+    def invalidate_items(self, list_name = None):
+        self.etags.pop(("items", self.get_list_name(list_name)), None)
+
+    def invalidate_lists(self):
+        self.etags.pop(("lists", None), None)
+
+    def get_conditional_headers(self, etag_key, conditional):
+        etag = self.etags.get(etag_key)
+        if conditional and etag is not None:
+            return {"If-None-Match": etag}
+        return None
+
+    def store_etag(self, etag_key, response):
+        if etag := response.headers.get("ETag"):
+            self.etags[etag_key] = etag
+        else:
+            self.etags.pop(etag_key, None)
+
+    @property
+    def server_available(self):
+        if self.config_entry.data.get(CONF_SERVER_ADDR) is not None:
+            return True
+        return self.binary_server is not None and self.binary_server.available
+
+    async def async_wait_for_server(self):
+        if self.config_entry.data.get(CONF_SERVER_ADDR) is None and self.binary_server is not None:
+            await self.binary_server.async_wait_ready()
+
     def get_server_address(self):
         addr = self.config_entry.data.get(CONF_SERVER_ADDR)
         if addr is not None:
             return addr
 
         if self.binary_server is not None and self.binary_server.available:
+            if self.socket_path is not None:
+                # The host is ignored when connecting through the Unix socket
+                return "http://localhost"
             return "http://127.0.0.1:{}".format(BINARY_SERVER_PORT)
 
         raise HomeAssistantError("Binary server is not running")
@@ -333,37 +642,3 @@ class Anylist:
 
     def get_list_name(self, list_name):
         return list_name or self.config_entry.options.get(CONF_DEFAULT_LIST, "")
-
-class AnylistServer(Thread):
-
-    def __init__(self, args):
-        super().__init__(name = DOMAIN, daemon = True)
-        self.args = args
-        self.process = None
-
-    @property
-    def available(self):
-        return self.process.poll() is None if self.process else False
-
-    def run(self):
-        self.process = subprocess.Popen(
-            self.args,
-            stdout = subprocess.PIPE,
-            stderr = subprocess.STDOUT
-        )
-
-        while self.process.poll() is None:
-            line = self.process.stdout.readline()
-            if line == b"":
-                break
-            _LOGGER.info(line[:-1].decode())
-
-        code = self.process.poll()
-        if code > 0:
-            _LOGGER.error("Binary server exited with error code: {}".format(code))
-
-        self.process = None
-
-    def stop(self, *args):
-        if self.process is not None:
-            self.process.terminate()
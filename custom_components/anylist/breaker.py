@@ -0,0 +1,94 @@
+import aiohttp
+import asyncio
+import time
+
+from homeassistant.exceptions import HomeAssistantError
+
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_RESET_TIMEOUT = 30
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+BREAKER_STATES = [STATE_CLOSED, STATE_OPEN, STATE_HALF_OPEN]
+
+BREAKER_ERRORS = (aiohttp.ClientError, asyncio.TimeoutError)
+
+class BreakerGuard:
+
+    def __init__(self, breaker):
+        self.breaker = breaker
+        self.status = None
+
+    def __enter__(self):
+        self.breaker.before_request()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None and issubclass(exc_type, BREAKER_ERRORS):
+            self.breaker.record_failure()
+        elif exc_type is None and self.status is not None and self.status >= 500:
+            self.breaker.record_failure()
+        elif exc_type is None:
+            self.breaker.record_success()
+        else:
+            # Cancelled or failed for reasons unrelated to the server
+            self.breaker.probing = False
+        return False
+
+class AnylistCircuitBreaker:
+
+    def __init__(self, threshold = BREAKER_FAILURE_THRESHOLD, reset_timeout = BREAKER_RESET_TIMEOUT):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.state = STATE_CLOSED
+        self.failure_count = 0
+        self.open_count = 0
+        self.opened_at = None
+        self.probing = False
+
+    def guard(self):
+        return BreakerGuard(self)
+
+    def get_retry_in(self):
+        if self.state != STATE_OPEN:
+            return None
+        return max(0, round(self.opened_at + self.reset_timeout - time.monotonic()))
+
+    def before_request(self):
+        if self.state == STATE_OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self.state = STATE_HALF_OPEN
+
+        if self.state == STATE_OPEN:
+            raise HomeAssistantError(
+                "Anylist server is not responding. Retrying in {} seconds.".format(self.get_retry_in())
+            )
+
+        if self.state == STATE_HALF_OPEN:
+            # Only one request probes the server while the others keep failing fast
+            if self.probing:
+                raise HomeAssistantError("Anylist server is not responding. Waiting for it to recover.")
+            self.probing = True
+
+    def record_success(self):
+        self.state = STATE_CLOSED
+        self.failure_count = 0
+        self.probing = False
+
+    def record_failure(self):
+        self.failure_count += 1
+        self.probing = False
+        if self.state == STATE_HALF_OPEN or self.failure_count >= self.threshold:
+            if self.state != STATE_OPEN:
+                self.open_count += 1
+            self.state = STATE_OPEN
+            self.opened_at = time.monotonic()
+
+    def as_dict(self):
+        return {
+            "state": self.state,
+            "failures": self.failure_count,
+            "opened": self.open_count,
+            "retry_in": self.get_retry_in()
+        }
@@ -6,6 +6,7 @@ from homeassistant import config_entries
 
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.helpers.selector import (
+    BooleanSelector,
     NumberSelector,
     NumberSelectorConfig,
     NumberSelectorMode,
@@ -24,7 +25,13 @@ from .const import (
     CONF_PASSWORD,
     CONF_SERVER_BINARY,
     CONF_DEFAULT_LIST,
-    CONF_REFRESH_INTERVAL
+    CONF_REFRESH_INTERVAL,
+    CONF_CONNECTION_LIMIT,
+    CONF_KEEPALIVE_TIMEOUT,
+    CONF_PUSH_UPDATES,
+    CONF_UNIX_SOCKET,
+    DEFAULT_CONNECTION_LIMIT,
+    DEFAULT_KEEPALIVE_TIMEOUT
 )
 
 _LOGGER = logging.getLogger(DOMAIN)
@@ -90,7 +97,38 @@ STEP_INIT_DATA_SCHEMA = vol.Schema(
                 unit_of_measurement = "minutes",
                 mode = NumberSelectorMode.SLIDER
             )
-        )
+        ),
+        vol.Optional(
+            CONF_CONNECTION_LIMIT,
+            default = DEFAULT_CONNECTION_LIMIT,
+        ): NumberSelector(
+            NumberSelectorConfig(
+                min = 1,
+                max = 100,
+                step = 1,
+                mode = NumberSelectorMode.BOX
+            )
+        ),
+        vol.Optional(
+            CONF_KEEPALIVE_TIMEOUT,
+            default = DEFAULT_KEEPALIVE_TIMEOUT,
+        ): NumberSelector(
+            NumberSelectorConfig(
+                min = 5,
+                max = 600,
+                step = 5,
+                unit_of_measurement = "seconds",
+                mode = NumberSelectorMode.BOX
+            )
+        ),
+        vol.Optional(
+            CONF_PUSH_UPDATES,
+            default = False,
+        ): BooleanSelector(),
+        vol.Optional(
+            CONF_UNIX_SOCKET,
+            default = False,
+        ): BooleanSelector()
     }
 )
 
@@ -8,9 +8,23 @@ CONF_SERVER_BINARY = "server_binary"
 
 CONF_DEFAULT_LIST = "default_list"
 CONF_REFRESH_INTERVAL = "refresh_interval"
+CONF_CONNECTION_LIMIT = "connection_limit"
+CONF_KEEPALIVE_TIMEOUT = "keepalive_timeout"
+CONF_PUSH_UPDATES = "push_updates"
+CONF_UNIX_SOCKET = "unix_socket"
+
+DEFAULT_CONNECTION_LIMIT = 10
+DEFAULT_KEEPALIVE_TIMEOUT = 60
+DEFAULT_PUSH_REFRESH_INTERVAL = 120
 
 ATTR_ID = "id"
 ATTR_NAME = "name"
 ATTR_LIST = "list"
 ATTR_CHECKED = "checked"
 ATTR_NOTES = "notes"
+ATTR_NAMES = "names"
+ATTR_IDS = "ids"
+ATTR_MAX_AGE = "max_age"
+
+CODE_QUEUED = 202
+CODE_AMBIGUOUS = 300
@@ -1,19 +1,239 @@
+import aiohttp
+import asyncio
 import datetime
 import logging
+import time
 
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from functools import partial
+
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
 from .const import DOMAIN
+from .index import ItemIndex
+from .models import AnylistItems
+from .scheduler import AnylistPollScheduler, POLL_TICK_INTERVAL
 
 _LOGGER = logging.getLogger(DOMAIN)
 
+LIST_REFRESH_COOLDOWN = 5
+
 class AnylistUpdateCoordinator(DataUpdateCoordinator):
 
-    def __init__(self, hass, config_entry, list_name, refresh_interval):
-        super().__init__(hass, _LOGGER, config_entry = config_entry, name = f"Anylist {list_name}", update_interval = datetime.timedelta(minutes = refresh_interval))
-        self.list_name = list_name
+    def __init__(self, hass, config_entry, list_names, refresh_interval):
+        # The coordinator only ticks; the scheduler decides which lists are due
+        super().__init__(hass, _LOGGER, config_entry = config_entry, name = "Anylist", update_interval = datetime.timedelta(seconds = POLL_TICK_INTERVAL), always_update = False)
+        self.list_names = list_names
+        self.scheduler = AnylistPollScheduler(refresh_interval * 60)
         self.hass = hass
+        self.list_debouncers = dict()
+        self.not_modified_count = 0
+        self.list_fetched_at = dict()
+        self.list_indexes = dict()
+        self.snapshot_saved_at = None
 
     async def _async_update_data(self):
-        code, items = await self.hass.data[DOMAIN].get_detailed_items(self.list_name)
-        return items
+        anylist = self.hass.data[DOMAIN]
+
+        due = self.scheduler.get_due_lists(self.list_names)
+        if not due:
+            return self.data
+
+        start = time.monotonic()
+        results = await anylist.run_batch(
+            [self.poll_list(list_name, conditional = self.get_list_items(list_name) is not None) for list_name in due]
+        )
+        anylist.metrics.record_refresh(time.monotonic() - start)
+
+        # Writes and discovery may have changed the data while the poll was running
+        current = self.data or {}
+        changed = self.data is None
+        failed = 0
+        data = {list_name: current[list_name] for list_name in self.list_names if list_name in current}
+        for list_name, (code, items) in zip(due, results):
+            if list_name not in self.list_names:
+                continue
+
+            schedule = self.scheduler.get_schedule(list_name)
+            if code == 304:
+                self.not_modified_count += 1
+                schedule.record_unchanged()
+            elif code == 200 and items == current.get(list_name):
+                schedule.record_unchanged()
+            elif code == 200:
+                schedule.record_change()
+                data[list_name] = items
+                changed = True
+            else:
+                schedule.record_error()
+                failed += 1
+
+            if code == 200 or code == 304:
+                self.list_fetched_at[list_name] = time.monotonic()
+
+        # Failing lists back off on their own schedule, so the update only fails once none are reachable
+        if failed and all(self.scheduler.get_schedule(list_name).error_count > 0 for list_name in self.list_names):
+            raise UpdateFailed("Failed to refresh {} lists".format(len(self.list_names)))
+
+        # Returning the current data unchanged skips the listener updates
+        return data if changed else self.data
+
+    async def poll_list(self, list_name, conditional = False):
+        try:
+            return await self.fetch_list(list_name, conditional = conditional)
+        except (aiohttp.ClientError, asyncio.TimeoutError, HomeAssistantError) as err:
+            _LOGGER.debug("Failed to refresh list %s: %s", list_name, err)
+            return (0, None)
+
+    async def async_request_full_refresh(self):
+        self.scheduler.mark_due(self.list_names)
+        await self.async_request_refresh()
+
+    def hydrate(self, items, saved_at):
+        # Snapshot items are shown until each list is fetched, but never count as fresh
+        self.data = {
+            list_name: AnylistItems.from_json(items[list_name])
+            for list_name in self.list_names if list_name in items
+        }
+        self.snapshot_saved_at = saved_at
+
+    def get_snapshot_age(self, list_name):
+        if self.snapshot_saved_at is None or list_name in self.list_fetched_at:
+            return None
+        if self.get_list_items(list_name) is None:
+            return None
+        return round(time.time() - self.snapshot_saved_at)
+
+    async def async_load_lists(self):
+        anylist = self.hass.data[DOMAIN]
+
+        async def load(list_name):
+            try:
+                code, items = await self.fetch_list(list_name)
+            except (aiohttp.ClientError, asyncio.TimeoutError, HomeAssistantError) as err:
+                _LOGGER.warning("Failed to load list %s: %s", list_name, err)
+                code = None
+
+            if code != 200:
+                # Lists without items are retried on the next tick instead of their first poll
+                self.scheduler.mark_due([list_name])
+                return
+
+            self.list_fetched_at[list_name] = time.monotonic()
+            data = dict(self.data or {})
+            data[list_name] = items
+            self.data = data
+            self.async_update_listeners()
+
+        await anylist.run_batch([load(list_name) for list_name in self.list_names])
+
+    async def async_refresh_list(self, list_name):
+        conditional = self.get_list_items(list_name) is not None
+        try:
+            code, items = await self.fetch_list(list_name, conditional = conditional)
+        except asyncio.TimeoutError as err:
+            raise HomeAssistantError("Timed out refreshing list {}".format(list_name)) from err
+        except aiohttp.ClientError as err:
+            raise HomeAssistantError("Failed to refresh list {}: {}".format(list_name, err)) from err
+        schedule = self.scheduler.get_schedule(list_name)
+        if code == 200:
+            self.set_list_items(list_name, items)
+            schedule.record_change()
+        elif code == 304:
+            self.not_modified_count += 1
+            schedule.schedule(schedule.interval)
+
+        if code == 200 or code == 304:
+            self.list_fetched_at[list_name] = time.monotonic()
+        return code
+
+    async def async_get_list_items(self, list_name, max_age = None):
+        age = self.get_list_age(list_name)
+        if age is None or (max_age is not None and age > max_age):
+            code = await self.async_refresh_list(list_name)
+            if code != 200 and code != 304:
+                return (code, [], age)
+            age = self.get_list_age(list_name)
+
+        return (200, self.get_list_items(list_name), age)
+
+    def get_list_age(self, list_name):
+        fetched_at = self.list_fetched_at.get(list_name)
+        if fetched_at is None or self.get_list_items(list_name) is None:
+            return None
+        return round(time.monotonic() - fetched_at, 1)
+
+    async def fetch_list(self, list_name, conditional = False):
+        anylist = self.hass.data[DOMAIN]
+        self.scheduler.record_request()
+        start = time.monotonic()
+        code, items = await anylist.get_detailed_items(list_name, conditional = conditional)
+        anylist.metrics.record_list_refresh(list_name, time.monotonic() - start)
+        if code == 200:
+            items = AnylistItems.from_json(items)
+        return (code, items)
+
+    async def async_request_list_refresh(self, list_name):
+        debouncer = self.list_debouncers.get(list_name)
+        if debouncer is None:
+            debouncer = self.list_debouncers[list_name] = Debouncer(
+                self.hass, _LOGGER,
+                cooldown = LIST_REFRESH_COOLDOWN,
+                immediate = False,
+                function = partial(self.reconcile_list, list_name)
+            )
+        await debouncer.async_call()
+
+    async def reconcile_list(self, list_name):
+        # Debounced refreshes run after writes that may have been journaled because the server is down
+        try:
+            await self.async_refresh_list(list_name)
+        except (aiohttp.ClientError, asyncio.TimeoutError, HomeAssistantError) as err:
+            _LOGGER.debug("Failed to refresh list %s: %s", list_name, err)
+            if list_name in self.list_names:
+                self.scheduler.get_schedule(list_name).record_error()
+
+    def set_list_names(self, list_names):
+        added = [list_name for list_name in list_names if list_name not in self.list_names]
+        removed = [list_name for list_name in self.list_names if list_name not in list_names]
+        self.list_names = list_names
+
+        for list_name in removed:
+            self.list_fetched_at.pop(list_name, None)
+            self.list_indexes.pop(list_name, None)
+            self.scheduler.remove(list_name)
+            if debouncer := self.list_debouncers.pop(list_name, None):
+                debouncer.async_shutdown()
+
+        if self.data is not None and removed:
+            self.data = {list_name: items for list_name, items in self.data.items() if list_name in list_names}
+
+        if added or removed:
+            self.async_update_listeners()
+        return (added, removed)
+
+    def set_list_items(self, list_name, items):
+        data = dict(self.data or {})
+        previous = data.get(list_name)
+        data[list_name] = items
+        self.data = data
+        self.async_update_listeners()
+        return previous
+
+    async def async_shutdown(self):
+        for debouncer in self.list_debouncers.values():
+            debouncer.async_shutdown()
+        await super().async_shutdown()
+
+    def get_list_index(self, list_name):
+        index = self.list_indexes.get(list_name)
+        if index is None:
+            index = self.list_indexes[list_name] = ItemIndex()
+        index.update(self.get_list_items(list_name))
+        return index
+
+    def get_list_items(self, list_name):
+        if self.data is None:
+            return None
+        return self.data.get(list_name)
@@ -0,0 +1,40 @@
+from .const import DOMAIN
+
+async def async_get_config_entry_diagnostics(hass, config_entry):
+    anylist = hass.data[DOMAIN]
+    coordinator = anylist.coordinator
+    server = anylist.binary_server
+
+    return {
+        "binary_server": {
+            "ready": server.available,
+            "restarts": server.restart_count,
+            "time_to_ready": server.time_to_ready,
+            "output": list(server.output)
+        } if server is not None else None,
+        "metrics": anylist.metrics.as_dict(),
+        "circuit_breaker": anylist.breaker.as_dict(),
+        "reads": {
+            "total": anylist.read_count,
+            "coalesced": anylist.coalesced_read_count
+        },
+        "writes": {
+            list_name: {
+                "flushes": queue.flush_count,
+                "sent": queue.sent_count,
+                "coalesced": queue.coalesced_count
+            }
+            for list_name, queue in anylist.write_queues.items()
+        },
+        "journal": {
+            "pending": anylist.journal.depth,
+            "replayed": anylist.journal.replayed_count,
+            "dropped": anylist.journal.dropped_count
+        } if anylist.journal is not None else None,
+        "coordinator": {
+            "lists": len(coordinator.list_names),
+            "not_modified_count": coordinator.not_modified_count,
+            "snapshot_saved_at": coordinator.snapshot_saved_at,
+            "polling": coordinator.scheduler.as_dict()
+        } if coordinator is not None else None
+    }
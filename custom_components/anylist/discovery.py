@@ -0,0 +1,98 @@
+import aiohttp
+import asyncio
+import datetime
+import logging
+
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.event import async_track_time_interval
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(DOMAIN)
+
+DISCOVERY_INTERVAL = datetime.timedelta(minutes = 5)
+DISCOVERY_COOLDOWN = 10
+
+class AnylistListDiscovery:
+
+    def __init__(self, hass, config_entry, coordinator, entity_factory, async_add_entities):
+        self.hass = hass
+        self.config_entry = config_entry
+        self.coordinator = coordinator
+        self.entity_factory = entity_factory
+        self.async_add_entities = async_add_entities
+        self.entities = dict()
+        self.lists = None
+        self.missing = set()
+        self.added_count = 0
+        self.removed_count = 0
+        self.debouncer = Debouncer(
+            hass, _LOGGER,
+            cooldown = DISCOVERY_COOLDOWN,
+            immediate = True,
+            function = self.async_discover
+        )
+
+    def add_entities(self, list_names):
+        entities = [self.entity_factory(list_name) for list_name in list_names]
+        for entity in entities:
+            self.entities[entity.list_name] = entity
+        self.async_add_entities(entities)
+
+    def start(self):
+        unsub = async_track_time_interval(self.hass, self.async_request_discovery, DISCOVERY_INTERVAL)
+        self.config_entry.async_on_unload(unsub)
+        self.config_entry.async_on_unload(self.debouncer.async_shutdown)
+
+    async def async_request_discovery(self, *args):
+        await self.debouncer.async_call()
+
+    async def async_discover(self):
+        anylist = self.hass.data[DOMAIN]
+        try:
+            code, lists = await anylist.get_lists(conditional = True)
+        except (aiohttp.ClientError, asyncio.TimeoutError, HomeAssistantError) as err:
+            _LOGGER.debug("Failed to discover lists: %s", err)
+            return
+
+        if code == 304:
+            lists = self.lists
+        elif code != 200:
+            return
+
+        if not lists:
+            # The server answers with no lists while it is still logging in
+            anylist.invalidate_lists()
+            return
+        self.lists = lists
+
+        # A list is only removed once it has been missing from two discoveries in a row
+        missing = [list_name for list_name in self.coordinator.list_names if list_name not in lists]
+        kept = [list_name for list_name in missing if list_name not in self.missing]
+        self.missing = set(missing)
+
+        added, removed = self.coordinator.set_list_names(lists + kept)
+        if not added and not removed:
+            return
+
+        _LOGGER.info("Discovered %d new and %d removed lists", len(added), len(removed))
+        self.added_count += len(added)
+        self.removed_count += len(removed)
+
+        registry = er.async_get(self.hass)
+        for list_name in removed:
+            entity = self.entities.pop(list_name, None)
+            if entity is None:
+                continue
+
+            if entity.registry_entry is not None:
+                registry.async_remove(entity.entity_id)
+            else:
+                await entity.async_remove(force_remove = True)
+
+        if added:
+            self.add_entities(added)
+            self.coordinator.scheduler.mark_due(added)
+            await self.coordinator.async_request_refresh()
@@ -0,0 +1,49 @@
+PLURAL_SUFFIXES = ("ches", "shes", "sses", "xes", "zes", "oes")
+
+def normalize_name(name):
+    return " ".join(name.casefold().split())
+
+def singularize_name(name):
+    # Plurals like "cookies" or "shoes" are ambiguous, so every likely singular is returned
+    if name.endswith("ies") and len(name) > 4:
+        return (name[:-3] + "y", name[:-1])
+    if name.endswith(PLURAL_SUFFIXES):
+        return (name[:-2], name[:-1])
+    if name.endswith("s") and not name.endswith("ss"):
+        return (name[:-1],)
+    return (name,)
+
+class ItemIndex:
+
+    def __init__(self):
+        self.source = None
+        self.names = dict()
+        self.singular_names = dict()
+
+    def update(self, items):
+        if items is self.source:
+            return
+
+        self.source = items
+        self.names = dict()
+        self.singular_names = dict()
+        for item in items or []:
+            # Pending items have no id on the server yet, so writes for them go by name
+            if item.pending:
+                continue
+
+            name = normalize_name(item.name)
+            self.names.setdefault(name, []).append(item)
+            for singular_name in singularize_name(name):
+                self.singular_names.setdefault(singular_name, []).append(item)
+
+    def find(self, item_name):
+        name = normalize_name(item_name)
+        if matches := self.names.get(name):
+            return matches
+
+        matches = dict()
+        for singular_name in singularize_name(name):
+            for item in self.singular_names.get(singular_name, []):
+                matches[item.id] = item
+        return list(matches.values())
@@ -1,9 +1,16 @@
 import logging
+import re
 
 from homeassistant.helpers import intent
 import homeassistant.helpers.config_validation as cv
+import voluptuous as vol
 
-from .const import DOMAIN
+from .const import (
+    DOMAIN,
+    CODE_QUEUED,
+    CODE_AMBIGUOUS
+)
+from .index import normalize_name, singularize_name
 
 _LOGGER = logging.getLogger(DOMAIN)
 
@@ -11,73 +18,165 @@ INTENT_ADD_ITEM = "AnylistAddItem"
 INTENT_REMOVE_ITEM = "AnylistRemoveItem"
 INTENT_GET_ITEMS = "AnylistGetItems"
 
+ITEM_SEPARATOR = re.compile(r"\s*(?:,\s*(?:and\b)?|\band\b|&)\s*", re.IGNORECASE)
+
+# Words from the default sentences that do not name a specific list
+LIST_SPECIFIERS = ("shopping", "any")
+
+# Articles the {list} wildcard can capture along with the list name
+LIST_ARTICLES = ("my", "the")
+
+SUCCESS_CODES = (200, 304, CODE_QUEUED)
+
 async def async_setup_intents(hass):
     intent.async_register(hass, AddItemIntent())
     intent.async_register(hass, RemoveItemIntent())
     intent.async_register(hass, GetItemsIntent())
 
-class AddItemIntent(intent.IntentHandler):
+def format_items(items):
+    count = len(items)
+    if count == 1:
+        return items[0]
 
-    intent_type = INTENT_ADD_ITEM
-    slot_schema = {"item": cv.string}
+    if count == 2:
+        return "{} and {}".format(items[0], items[1])
 
-    async def async_handle(self, intent_obj: intent.Intent):
-        slots = self.async_validate_slots(intent_obj.slots)
-        item = slots["item"]["value"]
-        code = await intent_obj.hass.data[DOMAIN].add_item(item.capitalize())
+    return "{}, and {}".format(", ".join(items[0:-1]), items[-1])
 
-        if code == 200 or code == 304:
-            speech = "I have added {} to your list.".format(item)
-        else:
-            speech = "An error has occurred while adding the item. Check logs for details."
+def split_items(anylist, text, list_name):
+    # Items like "mac and cheese" that are already on the list are kept whole
+    if anylist.find_items(text, list_name):
+        return [text]
+
+    items = [item.strip() for item in ITEM_SEPARATOR.split(text)]
+    return [item for item in items if item] or [text]
+
+def strip_list_name(name):
+    words = name.split()
+    while words and words[0] in LIST_ARTICLES:
+        words = words[1:]
+    if words and words[-1] == "list":
+        words = words[:-1]
+    return " ".join(words)
+
+def resolve_list(anylist, spoken):
+    if not spoken:
+        return (True, None)
+
+    coordinator = anylist.coordinator
+    list_names = coordinator.list_names if coordinator is not None else []
+    names = {normalize_name(list_name): list_name for list_name in list_names}
+    if list_name := names.get(normalize_name(spoken)):
+        return (True, list_name)
+
+    stripped_names = {strip_list_name(name): list_name for name, list_name in names.items()}
+    singular_names = {
+        singular_name: list_name
+        for name, list_name in stripped_names.items() for singular_name in singularize_name(name)
+    }
+
+    name = strip_list_name(normalize_name(spoken))
+    if not name:
+        return (True, None)
+
+    if list_name := stripped_names.get(name):
+        return (True, list_name)
+
+    for singular_name in singularize_name(name):
+        if list_name := singular_names.get(singular_name):
+            return (True, list_name)
+
+    return (name in LIST_SPECIFIERS, None)
+
+def get_list_phrase(list_name):
+    return "your {} list".format(list_name) if list_name else "your list"
+
+def get_status(codes):
+    return next((code for code in codes if code not in SUCCESS_CODES), 200)
+
+class AnylistIntentHandler(intent.IntentHandler):
+
+    async def async_handle(self, intent_obj: intent.Intent):
+        anylist = intent_obj.hass.data[DOMAIN]
+        with anylist.metrics.measure_intent(self.intent_type) as timer:
+            slots = self.async_validate_slots(intent_obj.slots)
+            found, list_name = resolve_list(anylist, slots.get("list", {}).get("value"))
+            if found:
+                timer.status, speech = await self.async_handle_list(anylist, slots, list_name)
+            else:
+                timer.status = 404
+                speech = "I could not find a list named {}.".format(slots["list"]["value"])
 
         response = intent_obj.create_response()
         response.async_set_speech(speech)
         return response
 
-class RemoveItemIntent(intent.IntentHandler):
+class AddItemIntent(AnylistIntentHandler):
 
-    intent_type = INTENT_REMOVE_ITEM
-    slot_schema = {"item": cv.string}
+    intent_type = INTENT_ADD_ITEM
+    slot_schema = {"item": cv.string, vol.Optional("list"): cv.string}
 
-    async def async_handle(self, intent_obj: intent.Intent):
-        slots = self.async_validate_slots(intent_obj.slots)
-        item = slots["item"]["value"]
-        code = await intent_obj.hass.data[DOMAIN].remove_item_by_name(item.capitalize())
+    async def async_handle_list(self, anylist, slots, list_name):
+        items = split_items(anylist, slots["item"]["value"], list_name)
+        codes = await anylist.add_items([item.capitalize() for item in items], list_name)
+        code = get_status(codes)
+
+        if code == 200:
+            speech = "I have added {} to {}.".format(format_items(items), get_list_phrase(list_name))
+        else:
+            speech = "An error has occurred while adding the item. Check logs for details."
+
+        return (code, speech)
+
+class RemoveItemIntent(AnylistIntentHandler):
 
-        if code == 200 or code == 304:
-            speech = "I have removed {} from your list.".format(item)
+    intent_type = INTENT_REMOVE_ITEM
+    slot_schema = {"item": cv.string, vol.Optional("list"): cv.string}
+
+    async def async_handle_list(self, anylist, slots, list_name):
+        items = split_items(anylist, slots["item"]["value"], list_name)
+        codes = await anylist.remove_items_by_name([item.capitalize() for item in items], list_name)
+        code = get_status(codes)
+        ambiguous = [item for item, item_code in zip(items, codes) if item_code == CODE_AMBIGUOUS]
+
+        if code == 200:
+            speech = "I have removed {} from {}.".format(format_items(items), get_list_phrase(list_name))
+        elif ambiguous:
+            speech = "There is more than one item matching {} on {}.".format(format_items(ambiguous), get_list_phrase(list_name))
         else:
             speech = "An error has occurred while removing the item. Check logs for details."
 
-        response = intent_obj.create_response()
-        response.async_set_speech(speech)
-        return response
+        return (code, speech)
 
-class GetItemsIntent(intent.IntentHandler):
+class GetItemsIntent(AnylistIntentHandler):
 
     intent_type = INTENT_GET_ITEMS
+    slot_schema = {vol.Optional("list"): cv.string}
 
-    async def async_handle(self, intent_obj: intent.Intent):
-        code, items = await intent_obj.hass.data[DOMAIN].get_items()
+    async def async_handle_list(self, anylist, slots, list_name):
+        items = self.get_cached_items(anylist, list_name)
+        if items is not None:
+            code = 200
+        else:
+            code, items, _ = await anylist.get_items(list_name)
 
         if code != 200:
             speech = "An error has occurred while getting the items on your list. Check logs for details."
         elif len(items) == 0:
-            speech = "There are no items on your list."
+            speech = "There are no items on {}.".format(get_list_phrase(list_name))
         else:
-            speech = "You have: {}.".format(self.format_items(items))
-
-        response = intent_obj.create_response()
-        response.async_set_speech(speech)
-        return response
+            speech = "You have: {}.".format(format_items(items))
 
-    def format_items(self, items):
-        count = len(items)
-        if count == 1:
-            return items[0]
+        return (code, speech)
 
-        if count == 2:
-            return "{} and {}".format(items[0], items[1])
+    def get_cached_items(self, anylist, list_name):
+        # Answer from coordinator data, including a restored snapshot, without waiting on the server
+        coordinator = anylist.coordinator
+        name = anylist.get_list_name(list_name)
+        if coordinator is None or name not in coordinator.list_names:
+            return None
 
-        return "{}, and {}".format(", ".join(items[0:-1]), items[-1])
+        items = coordinator.get_list_items(name)
+        if items is None:
+            return None
+        return items.unchecked_names
@@ -0,0 +1,140 @@
+import asyncio
+import logging
+
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    DOMAIN,
+    ATTR_LIST
+)
+from .writes import (
+    OFFLINE_ERRORS,
+    Mutation,
+    coalesce_mutations
+)
+
+_LOGGER = logging.getLogger(DOMAIN)
+
+JOURNAL_VERSION = 1
+JOURNAL_SAVE_DELAY = 1
+JOURNAL_RETRY_MIN_DELAY = 5
+JOURNAL_RETRY_MAX_DELAY = 300
+
+class AnylistJournal:
+
+    def __init__(self, hass, anylist, config_entry):
+        self.hass = hass
+        self.anylist = anylist
+        self.config_entry = config_entry
+        self.store = Store(hass, JOURNAL_VERSION, "{}.{}.journal".format(DOMAIN, config_entry.entry_id))
+        self.entries = []
+        self.task = None
+        self.replayed_count = 0
+        self.dropped_count = 0
+
+    @property
+    def depth(self):
+        return len(self.entries)
+
+    async def async_load(self):
+        data = await self.store.async_load()
+        self.entries = (data or {}).get("entries", [])
+        if self.entries:
+            _LOGGER.info("Replaying %d pending writes", len(self.entries))
+            self.start()
+
+    def has_pending(self, list_name):
+        return any(entry["body"].get(ATTR_LIST) == list_name for entry in self.entries)
+
+    def append(self, endpoint, body):
+        self.entries.append({"endpoint": endpoint, "body": body})
+        self.store.async_delay_save(self.get_data, JOURNAL_SAVE_DELAY)
+        self.start()
+
+    def get_data(self):
+        return {"entries": self.entries}
+
+    def start(self):
+        if self.task is None or self.task.done():
+            self.task = self.config_entry.async_create_background_task(
+                self.hass, self.run(), "anylist_journal_replay"
+            )
+
+    def cancel(self):
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+    async def stop(self):
+        self.cancel()
+        await self.store.async_save(self.get_data())
+
+    async def async_remove(self):
+        await self.store.async_remove()
+
+    async def run(self):
+        delay = JOURNAL_RETRY_MIN_DELAY
+        while self.entries:
+            try:
+                await self.replay()
+            except OFFLINE_ERRORS as err:
+                _LOGGER.debug("Server unavailable, retrying %d pending writes in %d seconds: %s", len(self.entries), delay, err)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, JOURNAL_RETRY_MAX_DELAY)
+            else:
+                delay = JOURNAL_RETRY_MIN_DELAY
+
+    async def replay(self):
+        await self.anylist.async_wait_for_server()
+
+        loop = asyncio.get_running_loop()
+        entries = list(self.entries)
+        mutations = [Mutation(entry["endpoint"], entry["body"], loop.create_future()) for entry in entries]
+        entry_by_future = {id(mutation.futures[0]): entry for entry, mutation in zip(entries, mutations)}
+
+        # Coalesce per list, since item names are only unique within a list
+        pending = []
+        for list_name in dict.fromkeys(mutation.body.get(ATTR_LIST) for mutation in mutations):
+            pending += coalesce_mutations([mutation for mutation in mutations if mutation.body.get(ATTR_LIST) == list_name])
+
+        kept = {id(future) for mutation in pending for future in mutation.futures}
+        dropped = [entry for future_id, entry in entry_by_future.items() if future_id not in kept]
+        self.dropped_count += len(dropped)
+        self.discard(dropped)
+
+        list_names = set()
+        try:
+            for mutation in pending:
+                code = await self.anylist.send_mutation(mutation.endpoint, mutation.body)
+                if not code or code >= 500:
+                    # Keep this write and the ones after it until the server recovers
+                    raise HomeAssistantError(
+                        "Server returned {} for pending {} of {}".format(code, mutation.endpoint, mutation.key)
+                    )
+                elif code == 200:
+                    self.replayed_count += 1
+                elif code == 304 or code == 404:
+                    # The server already has the change or the item is gone
+                    _LOGGER.debug("Dropped conflicting %s for %s with code %d", mutation.endpoint, mutation.key, code)
+                    self.dropped_count += 1
+                else:
+                    _LOGGER.warning("Dropped pending %s for %s with code %d", mutation.endpoint, mutation.key, code)
+                    self.dropped_count += 1
+
+                list_names.add(mutation.body.get(ATTR_LIST))
+                self.discard([entry_by_future[id(future)] for future in mutation.futures])
+        finally:
+            coordinator = self.anylist.coordinator
+            for list_name in list_names:
+                self.anylist.invalidate_items(list_name)
+                if coordinator is not None and list_name in coordinator.list_names:
+                    await coordinator.async_request_list_refresh(list_name)
+
+    def discard(self, done):
+        if not done:
+            return
+
+        done_ids = {id(entry) for entry in done}
+        self.entries = [entry for entry in self.entries if id(entry) not in done_ids]
+        self.store.async_delay_save(self.get_data, JOURNAL_SAVE_DELAY)
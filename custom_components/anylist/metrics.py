@@ -0,0 +1,94 @@
+import collections
+import time
+
+METRICS_SAMPLE_SIZE = 500
+
+METRICS_ENDPOINTS = ("add", "remove", "update", "check", "items", "lists")
+
+def percentile(samples, fraction):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+class EndpointMetrics:
+
+    def __init__(self):
+        self.count = 0
+        self.error_count = 0
+        self.status_counts = collections.Counter()
+        self.latencies = collections.deque(maxlen = METRICS_SAMPLE_SIZE)
+        self.sizes = collections.deque(maxlen = METRICS_SAMPLE_SIZE)
+
+    def record(self, duration, status, size):
+        self.count += 1
+        self.status_counts[status] += 1
+        if status != 200 and status != 304:
+            self.error_count += 1
+        self.latencies.append(duration)
+        if size is not None:
+            self.sizes.append(size)
+
+    def latency_ms(self, fraction):
+        value = percentile(self.latencies, fraction)
+        return round(value * 1000, 1) if value is not None else None
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "errors": self.error_count,
+            "status_codes": {str(status): count for status, count in self.status_counts.items()},
+            "latency_p50_ms": self.latency_ms(0.5),
+            "latency_p95_ms": self.latency_ms(0.95),
+            "latency_p99_ms": self.latency_ms(0.99),
+            "payload_p50_bytes": percentile(self.sizes, 0.5),
+            "payload_max_bytes": max(self.sizes) if self.sizes else None
+        }
+
+class RequestTimer:
+
+    def __init__(self, endpoint_metrics):
+        self.endpoint_metrics = endpoint_metrics
+        self.status = None
+        self.size = None
+
+    def __enter__(self):
+        self.start = time.monotonic()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # Requests that never got a response are recorded with status 0
+        status = self.status if exc_type is None and self.status is not None else 0
+        self.endpoint_metrics.record(time.monotonic() - self.start, status, self.size)
+        return False
+
+class AnylistMetrics:
+
+    def __init__(self):
+        self.endpoints = {endpoint: EndpointMetrics() for endpoint in METRICS_ENDPOINTS}
+        self.intents = dict()
+        self.refresh_duration = None
+        self.list_refresh_durations = dict()
+
+    def measure(self, endpoint):
+        return RequestTimer(self.endpoints[endpoint])
+
+    def measure_intent(self, intent_type):
+        intent_metrics = self.intents.get(intent_type)
+        if intent_metrics is None:
+            intent_metrics = self.intents[intent_type] = EndpointMetrics()
+        return RequestTimer(intent_metrics)
+
+    def record_refresh(self, duration):
+        self.refresh_duration = duration
+
+    def record_list_refresh(self, list_name, duration):
+        self.list_refresh_durations[list_name] = duration
+
+    def as_dict(self):
+        return {
+            "endpoints": {endpoint: metrics.as_dict() for endpoint, metrics in self.endpoints.items()},
+            "intents": {intent_type: metrics.as_dict() for intent_type, metrics in self.intents.items()},
+            "refresh_duration": self.refresh_duration,
+            "list_refresh_durations": dict(self.list_refresh_durations)
+        }
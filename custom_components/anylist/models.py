@@ -0,0 +1,98 @@
+import sys
+
+from .const import (
+    ATTR_ID,
+    ATTR_NAME,
+    ATTR_CHECKED,
+    ATTR_NOTES
+)
+
+# Items added locally keep this id until the list is refreshed from the server
+PENDING_ID_PREFIX = "pending_"
+
+class AnylistItem:
+
+    __slots__ = ("id", "name", "checked", "notes")
+
+    def __init__(self, id, name, checked = False, notes = ""):
+        self.id = id
+        self.name = name
+        self.checked = checked
+        self.notes = notes
+
+    @classmethod
+    def from_dict(cls, data):
+        # Names repeat across lists and refreshes, so they share one string
+        return cls(
+            data.get(ATTR_ID, ""),
+            sys.intern(data.get(ATTR_NAME) or ""),
+            bool(data.get(ATTR_CHECKED, False)),
+            data.get(ATTR_NOTES) or ""
+        )
+
+    @property
+    def pending(self):
+        return self.id.startswith(PENDING_ID_PREFIX)
+
+    def as_dict(self):
+        return {
+            ATTR_ID: self.id,
+            ATTR_NAME: self.name,
+            ATTR_CHECKED: self.checked,
+            ATTR_NOTES: self.notes
+        }
+
+    def replace(self, updates):
+        return AnylistItem(
+            self.id,
+            sys.intern(updates.get(ATTR_NAME, self.name)),
+            updates.get(ATTR_CHECKED, self.checked),
+            updates.get(ATTR_NOTES, self.notes)
+        )
+
+    def __eq__(self, other):
+        if not isinstance(other, AnylistItem):
+            return NotImplemented
+        return (
+            self.id == other.id
+            and self.name == other.name
+            and self.checked == other.checked
+            and self.notes == other.notes
+        )
+
+    __hash__ = None
+
+    def __repr__(self):
+        return "AnylistItem({!r}, {!r}, checked = {})".format(self.id, self.name, self.checked)
+
+class AnylistItems:
+
+    __slots__ = ("items", "unchecked_names", "checked_names")
+
+    def __init__(self, items = ()):
+        self.items = tuple(items)
+        # Partitions are built once; the lists must not be modified by callers
+        self.unchecked_names = []
+        self.checked_names = []
+        for item in self.items:
+            (self.checked_names if item.checked else self.unchecked_names).append(item.name)
+
+    @classmethod
+    def from_json(cls, items):
+        return cls(AnylistItem.from_dict(item) for item in items or [])
+
+    def as_json(self):
+        return [item.as_dict() for item in self.items]
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __eq__(self, other):
+        if not isinstance(other, AnylistItems):
+            return NotImplemented
+        return self.items == other.items
+
+    __hash__ = None
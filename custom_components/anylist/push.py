@@ -0,0 +1,91 @@
+import aiohttp
+import asyncio
+import json
+import logging
+
+from homeassistant.exceptions import HomeAssistantError
+
+from .const import (
+    DOMAIN,
+    ATTR_LIST
+)
+
+_LOGGER = logging.getLogger(DOMAIN)
+
+PUSH_ENDPOINT = "events"
+PUSH_HEARTBEAT = 30
+PUSH_RECONNECT_MIN_DELAY = 5
+PUSH_RECONNECT_MAX_DELAY = 300
+
+class AnylistPushListener:
+
+    def __init__(self, hass, config_entry, coordinator, discovery):
+        self.hass = hass
+        self.config_entry = config_entry
+        self.coordinator = coordinator
+        self.discovery = discovery
+        self.task = None
+        self.connected = False
+        self.connection_count = 0
+
+    def start(self):
+        self.task = self.config_entry.async_create_background_task(
+            self.hass, self.run(), "anylist_push_listener"
+        )
+
+    def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+    async def run(self):
+        delay = PUSH_RECONNECT_MIN_DELAY
+        while True:
+            try:
+                await self.listen()
+                delay = PUSH_RECONNECT_MIN_DELAY
+            except (aiohttp.ClientError, HomeAssistantError) as err:
+                _LOGGER.debug("Push connection failed: %s", err)
+            finally:
+                self.connected = False
+
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, PUSH_RECONNECT_MAX_DELAY)
+
+    async def listen(self):
+        anylist = self.hass.data[DOMAIN]
+        await anylist.async_wait_for_server()
+        url = anylist.get_server_url(PUSH_ENDPOINT)
+
+        async with anylist.session.ws_connect(url, heartbeat = PUSH_HEARTBEAT) as ws:
+            _LOGGER.debug("Push connection established")
+            self.connected = True
+            self.connection_count += 1
+
+            # Changes made while disconnected were never pushed
+            if self.connection_count > 1:
+                await self.discovery.async_request_discovery()
+                await self.coordinator.async_request_full_refresh()
+
+            async for message in ws:
+                if message.type == aiohttp.WSMsgType.TEXT:
+                    await self.handle_message(message.data)
+                elif message.type == aiohttp.WSMsgType.ERROR:
+                    break
+
+    async def handle_message(self, data):
+        try:
+            message = json.loads(data)
+        except ValueError:
+            _LOGGER.debug("Ignoring malformed push message: %s", data)
+            return
+
+        list_name = message.get(ATTR_LIST) if isinstance(message, dict) else None
+        if list_name in self.coordinator.list_names:
+            await self.coordinator.async_request_list_refresh(list_name)
+        elif list_name is None:
+            await self.discovery.async_request_discovery()
+            await self.coordinator.async_request_full_refresh()
+        else:
+            # A list we do not know about yet was created or renamed
+            await self.discovery.async_request_discovery()
@@ -0,0 +1,96 @@
+import collections
+import random
+import time
+
+POLL_TICK_INTERVAL = 30
+POLL_ACTIVE_INTERVAL = 120
+POLL_BACKOFF_FACTOR = 2
+POLL_JITTER = 0.1
+POLL_ERROR_MAX_INTERVAL = 3600
+POLL_BUDGET_PER_MINUTE = 30
+
+class ListSchedule:
+
+    def __init__(self, max_interval):
+        self.max_interval = max_interval
+        self.interval = max_interval
+        self.error_count = 0
+        # Spread the first polls over a whole interval instead of firing them together
+        self.next_poll = time.monotonic() + random.uniform(0, max_interval)
+
+    def is_due(self, now):
+        return now >= self.next_poll
+
+    def record_change(self):
+        self.error_count = 0
+        self.interval = min(POLL_ACTIVE_INTERVAL, self.max_interval)
+        self.schedule(self.interval)
+
+    def record_unchanged(self):
+        self.error_count = 0
+        self.interval = min(self.interval * POLL_BACKOFF_FACTOR, self.max_interval)
+        self.schedule(self.interval)
+
+    def record_error(self):
+        self.error_count += 1
+        delay = self.interval * POLL_BACKOFF_FACTOR ** self.error_count
+        self.schedule(min(delay, max(POLL_ERROR_MAX_INTERVAL, self.max_interval)))
+
+    def schedule(self, delay):
+        self.next_poll = time.monotonic() + delay * random.uniform(1 - POLL_JITTER, 1 + POLL_JITTER)
+
+    def as_dict(self):
+        return {
+            "interval": round(self.interval),
+            "next_poll_in": round(max(0, self.next_poll - time.monotonic())),
+            "errors": self.error_count
+        }
+
+class AnylistPollScheduler:
+
+    def __init__(self, max_interval, budget = POLL_BUDGET_PER_MINUTE):
+        self.max_interval = max_interval
+        self.budget = budget
+        self.schedules = dict()
+        self.requests = collections.deque()
+        self.deferred_count = 0
+
+    def get_schedule(self, list_name):
+        schedule = self.schedules.get(list_name)
+        if schedule is None:
+            schedule = self.schedules[list_name] = ListSchedule(self.max_interval)
+        return schedule
+
+    def remove(self, list_name):
+        self.schedules.pop(list_name, None)
+
+    def mark_due(self, list_names):
+        now = time.monotonic()
+        for list_name in list_names:
+            self.get_schedule(list_name).next_poll = now
+
+    def record_request(self):
+        self.requests.append(time.monotonic())
+
+    def get_remaining_budget(self):
+        cutoff = time.monotonic() - 60
+        while self.requests and self.requests[0] < cutoff:
+            self.requests.popleft()
+        return max(0, self.budget - len(self.requests))
+
+    def get_due_lists(self, list_names):
+        now = time.monotonic()
+        due = [list_name for list_name in list_names if self.get_schedule(list_name).is_due(now)]
+        due.sort(key = lambda list_name: self.schedules[list_name].next_poll)
+
+        # Lists over the budget stay due and are picked up by a later tick
+        remaining = self.get_remaining_budget()
+        self.deferred_count += max(0, len(due) - remaining)
+        return due[:remaining]
+
+    def as_dict(self):
+        return {
+            "budget_remaining": self.get_remaining_budget(),
+            "deferred": self.deferred_count,
+            "lists": {list_name: schedule.as_dict() for list_name, schedule in self.schedules.items()}
+        }
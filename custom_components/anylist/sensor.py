@@ -0,0 +1,136 @@
+import datetime
+
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorStateClass,
+)
+from homeassistant.const import (
+    EntityCategory,
+    UnitOfTime,
+)
+
+from .breaker import BREAKER_STATES
+from .const import DOMAIN
+from .metrics import METRICS_ENDPOINTS
+
+SCAN_INTERVAL = datetime.timedelta(seconds = 60)
+
+async def async_setup_entry(hass, config_entry, async_add_entities):
+    anylist = hass.data[DOMAIN]
+    metrics = anylist.metrics
+
+    entities = [AnylistLatencySensor(metrics, endpoint) for endpoint in METRICS_ENDPOINTS]
+    entities.append(AnylistRefreshDurationSensor(metrics))
+    entities.append(AnylistPendingWritesSensor(metrics, anylist.journal))
+    entities.append(AnylistCircuitBreakerSensor(metrics, anylist.breaker))
+    async_add_entities(entities)
+
+class AnylistDiagnosticSensor(SensorEntity):
+
+    _attr_has_entity_name = True
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    def __init__(self, metrics):
+        self.metrics = metrics
+
+class AnylistLatencySensor(AnylistDiagnosticSensor):
+
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _unrecorded_attributes = frozenset(
+        {
+            "count",
+            "errors",
+            "status_codes",
+            "latency_p50_ms",
+            "latency_p95_ms",
+            "latency_p99_ms",
+            "payload_p50_bytes",
+            "payload_max_bytes"
+        }
+    )
+
+    def __init__(self, metrics, endpoint):
+        super().__init__(metrics)
+        self._attr_unique_id = f"anylist_{endpoint}_latency"
+        self._attr_name = f"{endpoint.capitalize()} latency"
+        self.endpoint = endpoint
+
+    @property
+    def native_value(self):
+        return self.metrics.endpoints[self.endpoint].latency_ms(0.95)
+
+    @property
+    def extra_state_attributes(self):
+        return self.metrics.endpoints[self.endpoint].as_dict()
+
+class AnylistRefreshDurationSensor(AnylistDiagnosticSensor):
+
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_native_unit_of_measurement = UnitOfTime.SECONDS
+    _attr_suggested_display_precision = 2
+    _unrecorded_attributes = frozenset({"lists"})
+
+    def __init__(self, metrics):
+        super().__init__(metrics)
+        self._attr_unique_id = "anylist_refresh_duration"
+        self._attr_name = "Refresh duration"
+
+    @property
+    def native_value(self):
+        return self.metrics.refresh_duration
+
+    @property
+    def extra_state_attributes(self):
+        return {
+            "lists": {
+                list_name: round(duration, 3)
+                for list_name, duration in self.metrics.list_refresh_durations.items()
+            }
+        }
+
+class AnylistPendingWritesSensor(AnylistDiagnosticSensor):
+
+    _unrecorded_attributes = frozenset({"replayed", "dropped"})
+
+    def __init__(self, metrics, journal):
+        super().__init__(metrics)
+        self._attr_unique_id = "anylist_pending_writes"
+        self._attr_name = "Pending writes"
+        self.journal = journal
+
+    @property
+    def native_value(self):
+        return self.journal.depth
+
+    @property
+    def extra_state_attributes(self):
+        return {
+            "replayed": self.journal.replayed_count,
+            "dropped": self.journal.dropped_count
+        }
+
+class AnylistCircuitBreakerSensor(AnylistDiagnosticSensor):
+
+    _attr_device_class = SensorDeviceClass.ENUM
+    _attr_state_class = None
+    _attr_options = BREAKER_STATES
+    _unrecorded_attributes = frozenset({"failures", "opened", "retry_in"})
+
+    def __init__(self, metrics, breaker):
+        super().__init__(metrics)
+        self._attr_unique_id = "anylist_circuit_breaker"
+        self._attr_name = "Circuit breaker"
+        self.breaker = breaker
+
+    @property
+    def native_value(self):
+        return self.breaker.state
+
+    @property
+    def extra_state_attributes(self):
+        breaker = self.breaker.as_dict()
+        breaker.pop("state")
+        return breaker
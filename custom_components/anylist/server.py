@@ -0,0 +1,226 @@
+import asyncio
+import collections
+import logging
+import os
+import stat
+import time
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.exceptions import HomeAssistantError
+
+from .const import (
+    DOMAIN,
+    CONF_EMAIL,
+    CONF_PASSWORD,
+    CONF_SERVER_BINARY,
+    CONF_UNIX_SOCKET
+)
+
+_LOGGER = logging.getLogger(DOMAIN)
+
+BINARY_SERVER_PORT = "28597"
+BINARY_SERVER_SOCKET = ".anylist_server.sock"
+
+SERVER_READY_TIMEOUT = 30
+SERVER_PROBE_INTERVAL = 0.5
+SERVER_RESTART_MIN_DELAY = 1
+SERVER_RESTART_MAX_DELAY = 300
+SERVER_STABLE_DURATION = 60
+
+SERVER_OUTPUT_LINES = 500
+SERVER_OUTPUT_LINE_LIMIT = 1024 * 1024
+SERVER_LOG_RATE_LIMIT = 20
+SERVER_LOG_RATE_INTERVAL = 60
+
+def get_server_socket(hass, config_entry):
+    if config_entry.data.get(CONF_SERVER_BINARY) is None:
+        return None
+
+    if not config_entry.options.get(CONF_UNIX_SOCKET, False):
+        return None
+
+    return hass.config.path(BINARY_SERVER_SOCKET)
+
+def start_server(hass, config_entry):
+    binary = config_entry.data.get(CONF_SERVER_BINARY)
+    email = config_entry.data.get(CONF_EMAIL)
+    password = config_entry.data.get(CONF_PASSWORD)
+
+    if binary is None or email is None or password is None:
+        return None
+
+    if not os.path.isfile(binary):
+        raise HomeAssistantError("Failed to locate server binary")
+
+    if not os.access(binary, os.X_OK):
+        _LOGGER.debug("Fixing server binary permissions")
+        os.chmod(binary, os.stat(binary).st_mode | stat.S_IEXEC)
+
+    if not os.access(binary, os.X_OK):
+        raise HomeAssistantError("Failed to fix server binary permissions")
+
+    credentials_file = hass.config.path(".anylist_credentials")
+    args = [
+        binary,
+        "--email", email,
+        "--password", password,
+        "--credentials-file", credentials_file
+    ]
+
+    socket_path = get_server_socket(hass, config_entry)
+    if socket_path is not None:
+        # A socket left behind by a previous run would make the bind fail
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        args += ["--unix-socket", socket_path]
+    else:
+        args += ["--port", BINARY_SERVER_PORT, "--ip-filter", "127.0.0.1"]
+
+    server = AnylistServer(hass, config_entry, args, int(BINARY_SERVER_PORT), socket_path, [email, password])
+    server.start()
+
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, server.stop)
+    return server
+
+def get_line_level(line):
+    lowered = line.lower()
+    if "error" in lowered or "exception" in lowered:
+        return logging.ERROR
+    if "warn" in lowered:
+        return logging.WARNING
+    return logging.DEBUG
+
+class AnylistServer:
+
+    def __init__(self, hass, config_entry, args, port, socket_path, secrets):
+        self.hass = hass
+        self.config_entry = config_entry
+        self.args = args
+        self.port = port
+        self.socket_path = socket_path
+        self.secrets = secrets
+        self.process = None
+        self.task = None
+        self.stopped = False
+        self.ready = asyncio.Event()
+        self.restart_count = 0
+        self.time_to_ready = None
+        self.output = collections.deque(maxlen = SERVER_OUTPUT_LINES)
+        self.log_window_start = 0
+        self.log_window_count = 0
+        self.suppressed_count = 0
+
+    @property
+    def available(self):
+        return self.ready.is_set()
+
+    def start(self):
+        self.task = self.config_entry.async_create_background_task(
+            self.hass, self.run(), "anylist_binary_server"
+        )
+
+    async def async_wait_ready(self, timeout = SERVER_READY_TIMEOUT):
+        try:
+            await asyncio.wait_for(self.ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            raise HomeAssistantError("Binary server is not running")
+
+    async def run(self):
+        delay = SERVER_RESTART_MIN_DELAY
+        while not self.stopped:
+            started = time.monotonic()
+            try:
+                await self.run_process(started)
+            except asyncio.CancelledError:
+                raise
+            except OSError as err:
+                _LOGGER.error("Failed to start binary server: %s", err)
+            except Exception:
+                # Anything else, e.g. an output line over the limit, must not end the supervisor
+                _LOGGER.exception("Binary server failed")
+
+            if self.stopped:
+                break
+
+            # Only back off when the binary keeps crashing shortly after starting
+            if time.monotonic() - started > SERVER_STABLE_DURATION:
+                delay = SERVER_RESTART_MIN_DELAY
+
+            _LOGGER.warning("Restarting binary server in %d seconds", delay)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, SERVER_RESTART_MAX_DELAY)
+            self.restart_count += 1
+
+    async def run_process(self, started):
+        self.process = await asyncio.create_subprocess_exec(
+            *self.args,
+            stdout = asyncio.subprocess.PIPE,
+            stderr = asyncio.subprocess.STDOUT,
+            limit = SERVER_OUTPUT_LINE_LIMIT
+        )
+        probe = asyncio.create_task(self.probe(started))
+
+        try:
+            async for line in self.process.stdout:
+                self.handle_line(line)
+
+            code = await self.process.wait()
+            if code != 0 and not self.stopped:
+                _LOGGER.error("Binary server exited with error code: {}".format(code))
+        finally:
+            probe.cancel()
+            self.ready.clear()
+            # The restarted binary would not bind while this one is still running
+            if self.process.returncode is None:
+                try:
+                    self.process.terminate()
+                except ProcessLookupError:
+                    pass
+            self.process = None
+
+    async def probe(self, started):
+        while True:
+            try:
+                if self.socket_path is not None:
+                    _, writer = await asyncio.open_unix_connection(self.socket_path)
+                else:
+                    _, writer = await asyncio.open_connection("127.0.0.1", self.port)
+            except OSError:
+                await asyncio.sleep(SERVER_PROBE_INTERVAL)
+                continue
+
+            writer.close()
+            self.time_to_ready = time.monotonic() - started
+            _LOGGER.info("Binary server ready after %.2f seconds", self.time_to_ready)
+            self.ready.set()
+            return
+
+    def handle_line(self, raw):
+        line = raw.decode(errors = "replace").rstrip()
+        for secret in self.secrets:
+            line = line.replace(secret, "**REDACTED**")
+        self.output.append(line)
+
+        level = get_line_level(line)
+        if not _LOGGER.isEnabledFor(level):
+            return
+
+        now = time.monotonic()
+        if now - self.log_window_start > SERVER_LOG_RATE_INTERVAL:
+            if self.suppressed_count > 0:
+                _LOGGER.warning("Suppressed %d lines of binary server output", self.suppressed_count)
+            self.log_window_start = now
+            self.log_window_count = 0
+            self.suppressed_count = 0
+
+        if self.log_window_count >= SERVER_LOG_RATE_LIMIT:
+            self.suppressed_count += 1
+            return
+
+        self.log_window_count += 1
+        _LOGGER.log(level, line)
+
+    def stop(self, *args):
+        self.stopped = True
+        if self.process is not None and self.process.returncode is None:
+            self.process.terminate()
@@ -0,0 +1,50 @@
+import logging
+import time
+
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(DOMAIN)
+
+SNAPSHOT_VERSION = 1
+SNAPSHOT_SAVE_DELAY = 10
+
+class AnylistSnapshot:
+
+    def __init__(self, hass, config_entry):
+        self.hass = hass
+        self.coordinator = None
+        self.store = Store(hass, SNAPSHOT_VERSION, "{}.{}".format(DOMAIN, config_entry.entry_id))
+
+    async def async_load(self):
+        try:
+            data = await self.store.async_load()
+        except Exception as err:
+            _LOGGER.warning("Failed to load list snapshot: %s", err)
+            return None
+
+        if not data or not data.get("lists"):
+            return None
+        return data
+
+    def attach(self, coordinator):
+        self.coordinator = coordinator
+        return coordinator.async_add_listener(self.schedule_save)
+
+    def schedule_save(self):
+        if self.coordinator.data:
+            self.store.async_delay_save(self.get_data, SNAPSHOT_SAVE_DELAY)
+
+    def get_data(self):
+        return {
+            "saved_at": time.time(),
+            "lists": self.coordinator.list_names,
+            "items": {
+                list_name: items.as_json()
+                for list_name, items in self.coordinator.data.items() if items is not None
+            }
+        }
+
+    async def async_remove(self):
+        await self.store.async_remove()
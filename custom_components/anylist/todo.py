@@ -1,32 +1,77 @@
+import asyncio
+import logging
+import time
+import uuid
+
 from homeassistant.components.todo import (
     TodoItem,
     TodoItemStatus,
     TodoListEntity,
     TodoListEntityFeature,
 )
+from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .coordinator import AnylistUpdateCoordinator
+from .discovery import AnylistListDiscovery
+from .models import PENDING_ID_PREFIX, AnylistItem, AnylistItems
+from .push import AnylistPushListener
+from .snapshot import AnylistSnapshot
 from .const import (
     DOMAIN,
-    ATTR_ID,
     ATTR_NAME,
     ATTR_CHECKED,
     ATTR_NOTES,
-    CONF_REFRESH_INTERVAL
+    CODE_QUEUED,
+    CONF_REFRESH_INTERVAL,
+    CONF_PUSH_UPDATES,
+    DEFAULT_PUSH_REFRESH_INTERVAL
 )
 
+_LOGGER = logging.getLogger(DOMAIN)
+
 async def async_setup_entry(hass, config_entry, async_add_entities):
+    start = time.monotonic()
     refresh_interval = config_entry.options.get(CONF_REFRESH_INTERVAL, 30)
+    push_updates = config_entry.options.get(CONF_PUSH_UPDATES, False)
+    if push_updates:
+        refresh_interval = max(refresh_interval, DEFAULT_PUSH_REFRESH_INTERVAL)
+
+    snapshot = AnylistSnapshot(hass, config_entry)
+    stored = await snapshot.async_load()
+    if stored is not None:
+        # Start from the last known lists so setup does not wait on the server
+        lists = stored["lists"]
+    else:
+        code, lists = await hass.data[DOMAIN].get_lists()
+
+    coordinator = AnylistUpdateCoordinator(hass, config_entry, lists, refresh_interval)
+    if stored is not None:
+        coordinator.hydrate(stored.get("items") or {}, stored.get("saved_at"))
+    hass.data[DOMAIN].coordinator = coordinator
+    config_entry.async_on_unload(snapshot.attach(coordinator))
+
+    discovery = AnylistListDiscovery(
+        hass, config_entry, coordinator,
+        lambda list_name: AnylistTodoListEntity(hass, coordinator, list_name),
+        async_add_entities
+    )
+    discovery.add_entities(lists)
+    discovery.start()
 
-    code, lists = await hass.data[DOMAIN].get_lists()
-    for list_name in lists:
-        coordinator = AnylistUpdateCoordinator(hass, config_entry, list_name, refresh_interval)
-        await coordinator.async_config_entry_first_refresh()
+    async def async_load_lists():
+        await coordinator.async_load_lists()
+        _LOGGER.info("Loaded %d lists in %.2f seconds", len(lists), time.monotonic() - start)
+        # Lists from a snapshot may be out of date
+        if stored is not None:
+            await discovery.async_request_discovery()
 
-        async_add_entities(
-            [AnylistTodoListEntity(hass, coordinator, list_name)]
-        )
+    config_entry.async_create_background_task(hass, async_load_lists(), "anylist_load_lists")
+
+    if push_updates:
+        listener = AnylistPushListener(hass, config_entry, coordinator, discovery)
+        listener.start()
+        config_entry.async_on_unload(listener.stop)
 
 class AnylistTodoListEntity(CoordinatorEntity[AnylistUpdateCoordinator], TodoListEntity):
 
@@ -44,45 +89,145 @@ class AnylistTodoListEntity(CoordinatorEntity[AnylistUpdateCoordinator], TodoLis
         self._attr_name = list_name
         self.list_name = list_name
         self.hass = hass
+        self._cached_source = None
+        self._cached_todo_items = None
+        self._cached_checked_names = []
+        self._cached_unchecked_names = []
 
     @property
-    def todo_items(self):
-        if self.coordinator.data is None:
-            return None
+    def list_items(self):
+        return self.coordinator.get_list_items(self.list_name)
 
-        items = [
+    @property
+    def todo_items(self):
+        self.update_cached_items()
+        return self._cached_todo_items
+
+    def update_cached_items(self):
+        # Coordinator data is replaced rather than mutated, so identity tells us when it changed
+        items = self.list_items
+        if items is self._cached_source:
+            return
+
+        self._cached_source = items
+        if items is None:
+            self._cached_todo_items = None
+            self._cached_checked_names = []
+            self._cached_unchecked_names = []
+            return
+
+        self._cached_todo_items = [
             TodoItem(
-                summary = item[ATTR_NAME],
-                uid = item[ATTR_ID],
-                status = TodoItemStatus.COMPLETED if item[ATTR_CHECKED] else TodoItemStatus.NEEDS_ACTION,
-                description = item[ATTR_NOTES]
+                summary = item.name,
+                uid = item.id,
+                status = TodoItemStatus.COMPLETED if item.checked else TodoItemStatus.NEEDS_ACTION,
+                description = item.notes
             )
-            for item in self.coordinator.data
+            for item in items
         ]
-        return items
+        self._cached_checked_names = items.checked_names
+        self._cached_unchecked_names = items.unchecked_names
 
     async def async_create_todo_item(self, item):
         updates = self.get_item_updates(item)
-        await self.hass.data[DOMAIN].add_item(
-            item.summary,
-            updates = updates,
-            list_name = self.list_name
+        pending_item = AnylistItem(
+            "{}{}".format(PENDING_ID_PREFIX, uuid.uuid4().hex),
+            updates[ATTR_NAME].strip(),
+            False,
+            updates[ATTR_NOTES]
         )
-        await self.coordinator.async_refresh()
+
+        codes = await self.async_write_through(
+            AnylistItems([*(self.list_items or ()), pending_item]),
+            [pending_item.id],
+            self.hass.data[DOMAIN].add_item(
+                item.summary,
+                updates = updates,
+                list_name = self.list_name
+            ),
+            "Failed to add item"
+        )
+
+        # Replace the pending item with the one from the server before the UI can target its id
+        if codes == [200]:
+            try:
+                await self.coordinator.async_refresh_list(self.list_name)
+            except HomeAssistantError as err:
+                _LOGGER.debug("Failed to refresh list %s after adding an item: %s", self.list_name, err)
 
     async def async_delete_todo_items(self, uids):
-        for uid in uids:
-            await self.hass.data[DOMAIN].remove_item_by_id(uid, list_name = self.list_name)
-        await self.coordinator.async_refresh()
+        items = {item.id: item for item in self.list_items or ()}
+        item_ids = [uid for uid in uids if not uid.startswith(PENDING_ID_PREFIX)]
+        # Pending items are removed by name, which also cancels their add if it has not been sent yet
+        pending_names = [items[uid].name for uid in uids if uid.startswith(PENDING_ID_PREFIX) and uid in items]
+
+        await self.async_write_through(
+            AnylistItems(item for item in self.list_items or () if item.id not in uids),
+            uids,
+            self.remove_items(item_ids, pending_names),
+            "Failed to remove items"
+        )
+
+    async def remove_items(self, item_ids, pending_names):
+        anylist = self.hass.data[DOMAIN]
+        id_codes, name_codes = await asyncio.gather(
+            anylist.remove_items_by_id(item_ids, list_name = self.list_name),
+            anylist.remove_items_by_name(pending_names, list_name = self.list_name, resolve = False)
+        )
+        return id_codes + name_codes
 
     async def async_update_todo_item(self, item):
         updates = self.get_item_updates(item)
-        await self.hass.data[DOMAIN].update_item(
-            item.uid,
-            updates = updates,
-            list_name = self.list_name
+        original = next((existing for existing in self.list_items or () if existing.id == item.uid), None)
+        await self.async_write_through(
+            AnylistItems(existing.replace(updates) if existing.id == item.uid else existing for existing in self.list_items or ()),
+            [item.uid],
+            self.update_item(item.uid, updates, original),
+            "Failed to update item"
         )
-        await self.coordinator.async_refresh()
+
+    async def update_item(self, uid, updates, original):
+        anylist = self.hass.data[DOMAIN]
+        if not uid.startswith(PENDING_ID_PREFIX):
+            return await anylist.update_item(uid, updates = updates, list_name = self.list_name)
+
+        # The server only knows a pending item by name, so only its checked state can be changed
+        if original is None or updates[ATTR_NAME].strip() != original.name or updates[ATTR_NOTES] != original.notes:
+            raise HomeAssistantError("Failed to update item. The item is still being added.")
+
+        if ATTR_CHECKED not in updates:
+            return 200
+        return await anylist.check_item(original.name, self.list_name, updates[ATTR_CHECKED], resolve = False)
+
+    async def async_write_through(self, items, uids, request, error):
+        previous = self.coordinator.set_list_items(self.list_name, items)
+        # The write queue refreshes the list once its writes have been sent
+        try:
+            codes = await request
+        except Exception:
+            self.roll_back(items, previous, uids)
+            raise
+
+        if not isinstance(codes, list):
+            codes = [codes]
+
+        if any(code != 200 and code != 304 and code != CODE_QUEUED for code in codes):
+            self.roll_back(items, previous, uids)
+            raise HomeAssistantError(error)
+        return codes
+
+    def roll_back(self, items, previous, uids):
+        current = self.list_items
+        if current is items:
+            self.coordinator.set_list_items(self.list_name, previous)
+            return
+
+        # Other writes and refreshes may have changed the list since, so only the affected items are restored
+        original = {item.id: item for item in previous or () if item.id in uids}
+        restored = [original.get(item.id) if item.id in uids else item for item in current or ()]
+        current_ids = {item.id for item in current or ()}
+        restored += [item for item_id, item in original.items() if item_id not in current_ids]
+        self.coordinator.set_list_items(self.list_name, AnylistItems(item for item in restored if item is not None))
 
     def get_item_updates(self, item):
         updates = dict()
@@ -96,8 +241,10 @@ class AnylistTodoListEntity(CoordinatorEntity[AnylistUpdateCoordinator], TodoLis
 
     @property
     def extra_state_attributes(self):
+        self.update_cached_items()
         return {
             "source_name": f"{self.list_name}",
-            "checked_items": [item[ATTR_NAME] for item in self.coordinator.data if item[ATTR_CHECKED]],
-            "unchecked_items": [item[ATTR_NAME] for item in self.coordinator.data if not item[ATTR_CHECKED]]
+            "checked_items": self._cached_checked_names,
+            "unchecked_items": self._cached_unchecked_names,
+            "snapshot_age": self.coordinator.get_snapshot_age(self.list_name)
         }
@@ -0,0 +1,147 @@
+import aiohttp
+import asyncio
+import logging
+
+from homeassistant.exceptions import HomeAssistantError
+
+from .const import (
+    DOMAIN,
+    ATTR_ID,
+    ATTR_NAME,
+    CODE_QUEUED
+)
+from .index import normalize_name
+
+_LOGGER = logging.getLogger(DOMAIN)
+
+WRITE_COALESCE_DELAY = 0.1
+
+MERGEABLE_ENDPOINTS = ("update", "check")
+
+OFFLINE_ERRORS = (aiohttp.ClientConnectionError, asyncio.TimeoutError, HomeAssistantError)
+
+class Mutation:
+
+    def __init__(self, endpoint, body, future):
+        self.endpoint = endpoint
+        self.body = body
+        self.futures = [future]
+
+    @property
+    def key(self):
+        if item_id := self.body.get(ATTR_ID):
+            return item_id
+        return normalize_name(self.body.get(ATTR_NAME, ""))
+
+    def set_result(self, code):
+        for future in self.futures:
+            if not future.done():
+                future.set_result(code)
+
+    def set_exception(self, err):
+        for future in self.futures:
+            if not future.done():
+                future.set_exception(err)
+
+    def cancel(self):
+        for future in self.futures:
+            future.cancel()
+
+def coalesce_mutations(mutations):
+    result = []
+    for mutation in mutations:
+        previous = [pending for pending in result if pending.key == mutation.key]
+        adds = [index for index, pending in enumerate(previous) if pending.endpoint == "add"]
+
+        if mutation.endpoint == "remove" and adds:
+            # The latest add and the writes after it never reach the server. The remove is
+            # still sent, since the server may have had the item before the add.
+            for pending in previous[adds[-1]:]:
+                result.remove(pending)
+                pending.set_result(200)
+            previous = previous[:adds[-1]]
+
+        if previous and previous[-1].endpoint == mutation.endpoint and mutation.endpoint in MERGEABLE_ENDPOINTS:
+            # Later writes to the same fields win, e.g. check followed by uncheck
+            previous[-1].body = {**previous[-1].body, **mutation.body}
+            previous[-1].futures += mutation.futures
+            continue
+
+        result.append(mutation)
+    return result
+
+class AnylistWriteQueue:
+
+    def __init__(self, anylist, list_name):
+        self.anylist = anylist
+        self.list_name = list_name
+        self.pending = []
+        self.task = None
+        self.flush_count = 0
+        self.sent_count = 0
+        self.coalesced_count = 0
+
+    async def submit(self, endpoint, body):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.pending.append(Mutation(endpoint, body, future))
+
+        if self.task is None or self.task.done():
+            self.task = loop.create_task(self.run())
+
+        return await future
+
+    async def run(self):
+        while self.pending:
+            # Give rapid successive writes a chance to join the same flush
+            await asyncio.sleep(WRITE_COALESCE_DELAY)
+            mutations, self.pending = self.pending, []
+            try:
+                await self.flush(mutations)
+            except asyncio.CancelledError:
+                for mutation in mutations:
+                    mutation.cancel()
+                raise
+
+    async def flush(self, mutations):
+        coalesced = coalesce_mutations(mutations)
+        self.flush_count += 1
+        self.sent_count += len(coalesced)
+        self.coalesced_count += len(mutations) - len(coalesced)
+
+        journal = self.anylist.journal
+        for mutation in coalesced:
+            # Writes queued while offline must be replayed before any later write to the list
+            if journal is not None and (journal.has_pending(self.list_name) or not self.anylist.server_available):
+                journal.append(mutation.endpoint, mutation.body)
+                mutation.set_result(CODE_QUEUED)
+                continue
+
+            try:
+                code = await self.anylist.send_mutation(mutation.endpoint, mutation.body)
+            except OFFLINE_ERRORS as err:
+                if journal is None:
+                    mutation.set_exception(err)
+                    continue
+
+                _LOGGER.warning("Server unavailable, queued %s for %s: %s", mutation.endpoint, mutation.key, err)
+                journal.append(mutation.endpoint, mutation.body)
+                mutation.set_result(CODE_QUEUED)
+            except Exception as err:
+                mutation.set_exception(err)
+            else:
+                mutation.set_result(code)
+
+        self.anylist.invalidate_items(self.list_name)
+        coordinator = self.anylist.coordinator
+        if coordinator is not None and self.list_name in coordinator.list_names:
+            await coordinator.async_request_list_refresh(self.list_name)
+
+    def cancel(self):
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+        for mutation in self.pending:
+            mutation.cancel()
+        self.pending = []